@@ -0,0 +1,96 @@
+"""
+Cache for the images and fonts the game draws with.
+
+Loading an image from disk or parsing a font file is far too slow to do every frame, so each asset is loaded once,
+converted to the display's pixel format, and handed back from the cache after that. The cache counts its hits and
+misses so it's easy to check that nothing is being loaded mid-game.
+"""
+# Imports
+import pygame
+
+
+class AssetCache:
+    """
+    Class to represent a cache of loaded images and fonts
+    Instance variables:
+    images - a dictionary mapping (path, alpha) tuples to loaded Surfaces
+    fonts - a dictionary mapping (path, size) tuples to loaded Fonts
+    hits - the number of requests that were answered from the cache
+    misses - the number of requests that had to load an asset
+    """
+    def __init__(self):
+        """
+        Default constructor for AssetCache
+        Creates an empty cache.
+        """
+        self.images = {}
+        self.fonts = {}
+        self.hits = 0
+        self.misses = 0
+
+    def image(self, path, alpha=True):
+        """
+        Method returns an image, loading it the first time it is asked for
+        :param path: the path of the image file
+        :param alpha: True to keep the image's transparency, False for a faster blit of an opaque image
+        :return: a Surface
+        """
+        key = (path, alpha)
+        image = self.images.get(key)
+        if image is not None:
+            self.hits += 1
+            return image
+        self.misses += 1
+        image = pygame.image.load(path)
+        # Converting needs a display; without one the image is kept in the format it was loaded in
+        if pygame.display.get_surface() is not None:
+            image = image.convert_alpha() if alpha else image.convert()
+        self.images[key] = image
+        return image
+
+    def font(self, path, size):
+        """
+        Method returns a font at a size, loading it the first time it is asked for
+        :param path: the path of the font file
+        :param size: the size of the font
+        :return: a Font
+        """
+        key = (path, size)
+        font = self.fonts.get(key)
+        if font is not None:
+            self.hits += 1
+            return font
+        self.misses += 1
+        font = pygame.font.Font(path, size)
+        self.fonts[key] = font
+        return font
+
+    def preload(self, images=(), fonts=()):
+        """
+        Method loads assets ahead of time so the first frames that use them don't have to
+        :param images: a list of image paths, or (path, alpha) tuples
+        :param fonts: a list of (path, size) tuples
+        :return: None
+        """
+        for image in images:
+            if isinstance(image, tuple):
+                self.image(*image)
+            else:
+                self.image(image)
+        for path, size in fonts:
+            self.font(path, size)
+
+    def clear(self):
+        """
+        Method empties the cache, for example after the display mode changes
+        :return: None
+        """
+        self.images.clear()
+        self.fonts.clear()
+
+    def stats(self):
+        """
+        Method returns the cache's counters
+        :return: a dictionary with the number of hits, misses, and cached images and fonts
+        """
+        return {"hits": self.hits, "misses": self.misses, "images": len(self.images), "fonts": len(self.fonts)}
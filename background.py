@@ -0,0 +1,112 @@
+"""
+Pre-rendered background for the game.
+
+The fill colour and the stars never change, so they are drawn once into a cached Surface and each frame only has to
+blit that Surface instead of filling the screen and drawing every star. Optional parallax layers split the stars across
+extra transparent Surfaces that scroll down the screen at different speeds; each layer costs two blits a frame no
+matter how many stars it has.
+"""
+# Imports
+import pygame
+
+# Constants
+BACKGROUND_COLOR = (0, 0, 100)  # Colour of the sky behind the stars
+STAR_COLOR = (255, 255, 255)    # Colour of the stars
+TRANSPARENT = (0, 0, 0)     # Colour key used for the see-through parts of the parallax layers
+
+
+class Background:
+    """
+    Class to represent the background as a few cached Surfaces
+    Instance variables:
+    size - a tuple with the width and height of the background
+    stars - a list of (x, y, radius) tuples for the stars
+    parallax_speeds - a list with the speed (in pixels per second) of each scrolling star layer
+    base - the Surface with the fill colour, and the stars too if there are no parallax layers
+    layers - a list of transparent Surfaces holding the stars of each parallax layer
+    """
+    def __init__(self, size, stars, parallax_speeds=()):
+        """
+        Constructor for Background
+        Renders the background Surfaces straight away.
+        :param size: a tuple with the width and height of the background
+        :param stars: a list of (x, y, radius) tuples for the stars
+        :param parallax_speeds: a list with the speed of each scrolling layer in pixels per second. The stars are shared
+        out between the layers. With no speeds the stars don't move and are drawn onto the base.
+        """
+        self.size = size
+        self.stars = stars
+        self.parallax_speeds = list(parallax_speeds)
+        self.base = None
+        self.layers = []
+        self.render()
+
+    def render(self):
+        """
+        Method draws the background into its cached Surfaces. It only needs to be called again if the stars or the size
+        change.
+        :return: None
+        """
+        self.base = pygame.Surface(self.size)
+        self.base.fill(BACKGROUND_COLOR)
+        self.layers = []
+        if len(self.parallax_speeds) == 0:
+            draw_stars(self.base, self.stars)
+        else:
+            count = len(self.parallax_speeds)
+            for i in range(count):
+                layer = pygame.Surface(self.size)
+                layer.fill(TRANSPARENT)
+                layer.set_colorkey(TRANSPARENT)
+                draw_stars(layer, self.stars[i::count])
+                self.layers.append(layer)
+        # Match the display's pixel format so blitting doesn't have to convert every frame
+        if pygame.display.get_surface() is not None:
+            self.base = self.base.convert()
+            self.layers = [layer.convert() for layer in self.layers]
+
+    def is_animated(self):
+        """
+        Method tells whether the background changes over time
+        :return: True if there are parallax layers, False otherwise
+        """
+        return len(self.layers) > 0
+
+    def draw(self, surface, seconds=None):
+        """
+        Method covers the surface with the background
+        :param surface: the surface to draw the background on
+        :param seconds: the time in seconds, used to work out how far each parallax layer has scrolled. Defaults to the
+        time since pygame was initialized.
+        :return: None
+        """
+        if seconds is None:
+            seconds = pygame.time.get_ticks() / 1000
+        surface.blit(self.base, (0, 0))
+        height = self.size[1]
+        for layer, speed in zip(self.layers, self.parallax_speeds):
+            # Draw the layer twice so the part that scrolls off the bottom comes back in at the top
+            offset = int(seconds * speed) % height
+            surface.blit(layer, (0, offset))
+            surface.blit(layer, (0, offset - height))
+
+    def restore(self, surface, rect):
+        """
+        Method covers part of the surface with the background, erasing whatever was drawn there. Only works for
+        backgrounds that aren't animated.
+        :param surface: the surface to draw the background on
+        :param rect: the Rect to cover
+        :return: None
+        """
+        surface.blit(self.base, rect, rect)
+
+
+def draw_stars(surface, stars):
+    """
+    Draw the stars onto a surface
+    :param surface: The surface to draw the stars on
+    :param stars: a list of (x, y, radius) tuples
+    :return: None
+    """
+    for star in stars:
+        pygame.draw.circle(surface, STAR_COLOR, star[:2], star[2])
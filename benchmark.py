@@ -0,0 +1,288 @@
+"""
+Benchmarks for the Galaga game logic and drawing.
+
+Runs headlessly, using SDL's dummy video driver for the drawing, so it works without a display. The scaling suite times
+one frame's worth of each expensive part of the game against synthetic fleets and missile counts far beyond what a real
+level reaches, so it shows how each part scales rather than how the game feels. Save the results and compare them
+against a run from another commit with:
+    python benchmark.py --output before.json
+    python benchmark.py --output after.json --compare before.json
+
+The missile collision crossover table used to tune GRID_FLEET_RATIO is printed with:
+    python benchmark.py --crossover
+"""
+# Imports
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+import numpy as np
+from missiles import MissilePool
+from profiler import percentile
+from simulation import GameSimulation
+
+# Constants
+ENEMY_COUNTS = [50, 100, 250, 500, 1000, 2500, 5000]   # Fleet sizes used by the scaling suite
+MISSILE_COUNTS = [10, 100, 1000]    # Missile counts used by the scaling suite
+DIVING_FRACTION = 0.1   # Fraction of the synthetic fleet that is diving at the player
+PHASES = ["move_enemies", "check_missile_collisions", "check_ship_collisions", "render", "render_dirty"]
+
+
+def make_game(enemies, missiles, seed=0):
+    """
+    Method builds a game with a synthetic fleet and missiles scattered over the playing field
+    :param enemies: the number of enemy ships in the fleet
+    :param missiles: the number of missiles in the air
+    :param seed: the seed used to place the ships and missiles
+    :return: a GameSimulation
+    """
+    rng = random.Random(seed)
+    game = GameSimulation()
+    width = game.width
+    height = game.height
+    game.fleet.add_ships([(rng.uniform(0, width - 15), rng.uniform(0, height * 0.8)) for _ in range(enemies)], 10)
+    game.player.missiles = MissilePool(max(missiles, game.player.missiles.capacity))
+    game.player.missiles.set_positions([(rng.uniform(0, width), rng.uniform(0, height)) for _ in range(missiles)])
+    return game
+
+
+def make_diving(game, fraction, seed=0):
+    """
+    Method sends some of the ships in the top half of the screen diving at the player, far enough away that none of
+    them hit the player straight away
+    :param game: the GameSimulation whose fleet should dive
+    :param fraction: the fraction of the fleet to send diving
+    :param seed: the seed used to pick the ships
+    :return: None
+    """
+    rng = random.Random(seed)
+    fleet = game.fleet
+    candidates = [i for i in range(len(fleet.y)) if fleet.y[i] < game.height / 2]
+    for i in rng.sample(candidates, min(len(candidates), int(len(fleet.y) * fraction))):
+        game.drop_enemy(i)
+
+
+def time_phase(game, function, fleet, missiles, repeats):
+    """
+    Method times one frame's worth of a part of the game, putting the fleet, missiles and sway back before each run so
+    every run does the same work
+    :param game: the GameSimulation to time
+    :param function: a function with no arguments that runs the part of the game
+    :param fleet: the Fleet to start each run with
+    :param missiles: the list of missiles to start each run with
+    :param repeats: the number of times to run it
+    :return: a list of the time of each run in microseconds
+    """
+    times = []
+    moves = game.moves
+    sway_direction = game.sway_direction
+    for _ in range(repeats):
+        game.fleet = fleet.copy()
+        game.player.missiles.set_positions(missiles)
+        game.moves = moves
+        game.sway_direction = sway_direction
+        start = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - start) * 1e6)
+    return times
+
+
+def init_display(width, height):
+    """
+    Method opens a window on SDL's dummy video driver, unless another driver was asked for, so drawing can be timed
+    without a display
+    :param width: the width of the window
+    :param height: the height of the window
+    :return: the display Surface
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    pygame.display.init()
+    pygame.font.init()
+    return pygame.display.set_mode((width, height))
+
+
+def make_renderers(screen, game):
+    """
+    Method sets up galaga.py's drawing for a game and builds both renderers
+    :param screen: the display Surface
+    :param game: the GameSimulation that will be drawn
+    :return: a tuple of a function that draws the sprites of a frame, a Renderer, and a DirtyRectRenderer
+    """
+    import galaga
+    from renderer import DirtyRectRenderer, Renderer
+    galaga.WIDTH = game.width
+    galaga.HEIGHT = game.height
+    galaga.build_layout()
+    # generate_stars appends to the global list, so empty it or every combination adds another 300 stars to draw
+    galaga.star_locations.clear()
+    galaga.generate_stars(300, random.Random(0))
+    galaga.build_background()
+    # Load the explosion from next to galaga.py rather than the working directory, so the benchmark runs from anywhere
+    galaga.EXPLOSION_IMAGE = os.path.join(os.path.dirname(os.path.abspath(galaga.__file__)), "explosion.png")
+    galaga.assets.preload([galaga.EXPLOSION_IMAGE], [(galaga.FONT, size) for size in galaga.FONT_SIZES])
+    return (lambda surface: galaga.draw_sprites(surface, game), Renderer(galaga.background),
+            DirtyRectRenderer(galaga.background))
+
+
+def bench_scaling(enemy_counts, missile_counts, repeats):
+    """
+    Method times the per-frame cost of moving the fleet, both collision checks, and drawing a frame with each renderer
+    for every combination of fleet size and missile count
+    :param enemy_counts: a list of fleet sizes
+    :param missile_counts: a list of missile counts
+    :param repeats: the number of times each part is timed
+    :return: a list of dictionaries with the fleet size, missile count, phase, and the mean, median, 99th percentile
+    and fastest time in microseconds
+    """
+    results = []
+    screen = None
+    for missiles in missile_counts:
+        for enemies in enemy_counts:
+            game = make_game(enemies, missiles)
+            make_diving(game, DIVING_FRACTION)
+            if screen is None:
+                screen = init_display(game.width, game.height)
+            draw_sprites, renderer, dirty_renderer = make_renderers(screen, game)
+            # Draw once so the dirty rect renderer has a previous frame to erase, as it would mid-game
+            dirty_renderer.present_frame(screen, draw_sprites)
+            fleet = game.fleet.copy()
+            shots = game.player.get_missiles().positions()
+            functions = {"move_enemies": game.move_enemies,
+                         "check_missile_collisions": game.check_missile_collisions,
+                         "check_ship_collisions": game.check_ship_collisions,
+                         "render": lambda: renderer.present_frame(screen, draw_sprites),
+                         "render_dirty": lambda: dirty_renderer.present_frame(screen, draw_sprites)}
+            for phase in PHASES:
+                times = time_phase(game, functions[phase], fleet, shots, repeats)
+                results.append({"enemies": enemies, "missiles": missiles, "phase": phase,
+                                "mean_us": sum(times) / len(times), "median_us": percentile(times, 0.5),
+                                "p99_us": percentile(times, 0.99), "min_us": min(times)})
+    return results
+
+
+def environment():
+    """
+    Method describes the machine and code the benchmark ran on, so saved results can be compared fairly
+    :return: a dictionary with the commit, Python, NumPy and pygame versions, platform, and time of the run
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    import pygame
+    return {"commit": commit, "python": platform.python_version(), "numpy": np.__version__,
+            "pygame": pygame.version.ver, "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def print_scaling(results, baseline=None):
+    """
+    Method prints the scaling results as a table, with the change from a baseline run if one is given
+    :param results: a list of dictionaries from bench_scaling
+    :param baseline: a list of dictionaries from an earlier bench_scaling run, or None
+    :return: None
+    """
+    previous = {}
+    if baseline is not None:
+        previous = {(result["enemies"], result["missiles"], result["phase"]): result for result in baseline}
+    print("%8s %8s %26s %12s %12s %12s" % ("enemies", "missiles", "phase", "median (us)", "p99 (us)", "change"))
+    for result in results:
+        old = previous.get((result["enemies"], result["missiles"], result["phase"]))
+        change = "%+.0f%%" % ((result["median_us"] / old["median_us"] - 1) * 100) if old else ""
+        print("%8d %8d %26s %12.1f %12.1f %12s" % (result["enemies"], result["missiles"], result["phase"],
+                                                   result["median_us"], result["p99_us"], change))
+
+
+def time_collisions(game, fleet, missiles, use_grid, repeats):
+    """
+    Method times a collision check, putting the fleet and missiles back before each run since hits remove them
+    :param game: the GameSimulation to check
+    :param fleet: the Fleet to start each run with
+    :param missiles: the list of missiles to start each run with
+    :param use_grid: True to time the grid, False to time checking each missile against the whole fleet
+    :param repeats: the number of times to run the check
+    :return: the average time of one check in microseconds
+    """
+    total = 0
+    for _ in range(repeats):
+        game.fleet = fleet.copy()
+        game.player.missiles.set_positions(missiles)
+        start = time.perf_counter()
+        game.check_missile_collisions(use_grid)
+        total += time.perf_counter() - start
+    return total / repeats * 1e6
+
+
+def bench_missile_collisions(enemy_counts, missile_counts, repeats):
+    """
+    Method compares scanning the whole fleet for each missile with the grid for every combination of fleet size and
+    missile count
+    :param enemy_counts: a list of fleet sizes
+    :param missile_counts: a list of missile counts
+    :param repeats: the number of times each check is timed
+    :return: a list of (enemies, missiles, scan microseconds, grid microseconds) tuples
+    """
+    results = []
+    for missiles in missile_counts:
+        for enemies in enemy_counts:
+            game = make_game(enemies, missiles)
+            fleet = game.fleet.copy()
+            shots = game.player.get_missiles().positions()
+            scan = time_collisions(game, fleet, shots, False, repeats)
+            grid = time_collisions(game, fleet, shots, True, repeats)
+            results.append((enemies, missiles, scan, grid))
+    return results
+
+
+def print_missile_collisions(results):
+    """
+    Method prints the missile collision results as a table, followed by the largest fleet the grid was faster for at
+    each missile count. GRID_FLEET_RATIO in simulation.py should be close to the fleet size where the grid stops
+    winning divided by the number of missiles.
+    :param results: a list of tuples from bench_missile_collisions
+    :return: None
+    """
+    print("%8s %8s %14s %14s %8s" % ("enemies", "missiles", "scan (us)", "grid (us)", "speedup"))
+    crossovers = {}
+    for enemies, missiles, scan, grid in results:
+        print("%8d %8d %14.1f %14.1f %7.1fx" % (enemies, missiles, scan, grid, scan / grid))
+        if grid < scan:
+            crossovers[missiles] = max(enemies, crossovers.get(missiles, 0))
+    print()
+    for missiles in sorted(set(result[1] for result in results)):
+        if missiles in crossovers:
+            print("%d missiles: grid is faster up to %d enemies (ratio %.1f)"
+                  % (missiles, crossovers[missiles], crossovers[missiles] / missiles))
+        else:
+            print("%d missiles: scanning the fleet was faster at every fleet size" % missiles)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the Galaga game logic")
+    parser.add_argument("--repeats", type=int, default=50, help="number of times each measurement is repeated")
+    parser.add_argument("--crossover", action="store_true",
+                        help="compare the two missile collision checks instead of running the scaling suite")
+    parser.add_argument("--enemies", type=int, nargs="+", default=ENEMY_COUNTS, help="fleet sizes to time")
+    parser.add_argument("--missiles", type=int, nargs="+", default=MISSILE_COUNTS, help="missile counts to time")
+    parser.add_argument("--output", metavar="FILE", help="write the scaling results to a JSON file")
+    parser.add_argument("--compare", metavar="FILE", help="show the change from the results in an earlier JSON file")
+    args = parser.parse_args()
+
+    if args.crossover:
+        print_missile_collisions(bench_missile_collisions([1, 5, 10, 25, 50, 100, 250, 500, 1000],
+                                                          [1, 2, 4, 8, 20, 100], args.repeats))
+    else:
+        results = bench_scaling(args.enemies, args.missiles, args.repeats)
+        baseline = None
+        if args.compare:
+            with open(args.compare) as f:
+                baseline = json.load(f)["results"]
+        print_scaling(results, baseline)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump({"environment": environment(), "repeats": args.repeats, "results": results}, f, indent=1)
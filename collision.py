@@ -0,0 +1,81 @@
+"""
+Collision tests between the player and the enemy ships.
+
+Each test runs in two phases over NumPy arrays. The broad phase throws out every ship whose bounding box can't reach
+the player's hit area, which is nearly all of them since diving ships spend most of their time far above the player.
+The narrow phase only looks at the ships left, comparing squared distances so no square roots are taken.
+
+Tests only report what they find. The simulation queues the results as Collision events and applies them once every
+test has run, so applying one (which can put the whole fleet back in formation) never changes what a test is looking at
+partway through.
+"""
+# Imports
+from collections import namedtuple
+
+# Kinds of collision
+SHIP_HITS_PLAYER = "ship_hits_player"   # An enemy ship crashed into the player
+
+# Collision is an event found by a collision test.
+# kind - the kind of collision, such as SHIP_HITS_PLAYER
+# index - the index in the fleet of the enemy ship involved
+Collision = namedtuple("Collision", ["kind", "index"])
+
+
+def player_hit_circle(position, ship_width):
+    """
+    Method works out the circle an enemy ship's centre has to be inside to hit the player
+    :param position: a list of the three vertices of the player's ship, tip first
+    :param ship_width: the width of an enemy ship
+    :return: a tuple of the x and y of the centre of the circle and its radius
+    """
+    center_x = position[0][0]
+    center_y = (position[0][1] + position[1][1]) / 2
+    radius = (1.5 * ship_width / 2) + (position[1][1] - position[0][1]) / 2
+    return center_x, center_y, radius
+
+
+def broad_phase(xs, ys, width, box):
+    """
+    Method finds the ships whose bounding boxes overlap a box
+    :param xs: a float array with the x coordinates of the top left of the ships
+    :param ys: a float array with the y coordinates of the top left of the ships
+    :param width: the width and height of a ship
+    :param box: a tuple of the left, top, right and bottom of the box
+    :return: a bool array, True for the ships that overlap the box
+    """
+    left, top, right, bottom = box
+    return (xs <= right) & (xs + width >= left) & (ys <= bottom) & (ys + width >= top)
+
+
+def narrow_phase(xs, ys, width, circle):
+    """
+    Method finds the ships whose centres are inside a circle, comparing squared distances
+    :param xs: a float array with the x coordinates of the top left of the ships
+    :param ys: a float array with the y coordinates of the top left of the ships
+    :param width: the width and height of a ship
+    :param circle: a tuple of the x and y of the centre of the circle and its radius
+    :return: a bool array, True for the ships inside the circle
+    """
+    center_x, center_y, radius = circle
+    dx = xs + width / 2 - center_x
+    dy = ys + width / 2 - center_y
+    return dx * dx + dy * dy < radius * radius
+
+
+def ships_hitting_player(fleet, indices, position):
+    """
+    Method finds the ships that have crashed into the player
+    :param fleet: the Fleet
+    :param indices: an int array with the indices of the ships to test, in order
+    :param position: a list of the three vertices of the player's ship, tip first
+    :return: a list of the indices of the ships that hit the player, in the order they were given
+    """
+    width = fleet.get_width()
+    circle = player_hit_circle(position, width)
+    center_x, center_y, radius = circle
+    # A ship whose box doesn't reach the square around the circle can't have its centre inside the circle
+    box = (center_x - radius, center_y - radius, center_x + radius, center_y + radius)
+    candidates = indices[broad_phase(fleet.x[indices], fleet.y[indices], width, box)]
+    if len(candidates) == 0:
+        return []
+    return candidates[narrow_phase(fleet.x[candidates], fleet.y[candidates], width, circle)].tolist()
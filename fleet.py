@@ -0,0 +1,390 @@
+"""
+Array-backed store for the enemy fleet.
+
+Every ship in the fleet is a position in a set of NumPy arrays (positions, speeds, starting positions, values and
+states) rather than a separate object, so the whole fleet is updated with a handful of vectorized operations each step
+instead of a Python loop over every ship. A ship keeps the same index for the whole level; destroyed ships are marked
+DESTROYED rather than removed so the indices of the others don't change.
+
+Each ship is always in exactly one of four states:
+IN_FORMATION -> DIVING       a ship in the formation starts diving at the player
+DIVING -> RESETTING          a diving ship falls off the bottom of the screen and starts flying back
+RESETTING -> IN_FORMATION    a ship flying back reaches its place in the formation
+any state -> DESTROYED       a ship is shot or crashes into the player
+The fleet keeps a set of the indices in each state, so changing a ship's state is constant time and each step only has
+to look at the ships in the states it is updating.
+
+A diving ship follows a cubic Bezier curve that is worked out once when it starts its dive: it swoops up and out to
+the side, then curves back in and comes down through the middle of the player's hit circle. Each step the end of the
+curve moves a little towards where the player is now, as the ships used to steer at the player. From the end of the
+curve the ship carries on straight down off the bottom of the screen, so a player who doesn't move out of the way is
+hit. The size of the swoop is a fraction of the size of the playing field, so dives look and play the same at any window
+size. Each step the position of every diving ship on its curve is evaluated in one NumPy batch, so many ships diving at
+once cost about the same as one.
+"""
+# Imports
+import numpy as np
+
+# Constants
+SHIP_WIDTH = 15     # Width and height of an enemy ship
+FLEET_SWAY_SPEED = 0.2   # Constant to determine the sway speed of the enemy ships
+DIVE_SPEED = 3  # Approximate distance a diving ship travels along its curve each step
+LOOP_WIDTH = 0.16   # How far out to the side a diving ship swoops, as a fraction of the width of the playing field
+LOOP_HEIGHT = 0.09  # How far up a diving ship swoops, as a fraction of the height of the playing field
+AIM_SPEED = 2   # Farthest the end of a diving ship's curve moves each step to follow the player
+# Turns the four control points of a cubic Bezier curve into the coefficients of t^0 to t^3, so a point on the curve
+# can be worked out with Horner's rule
+BEZIER_TO_POWER = np.array([[1, 0, 0, 0],
+                            [-3, 3, 0, 0],
+                            [3, -6, 3, 0],
+                            [-1, 3, -3, 1]], dtype=float)
+RESET_SPEED = 1     # Speed of a ship flying back to its place in the formation
+SNAP_DISTANCE = 10  # Distance at which a returning ship jumps the rest of the way into its place
+
+# Ship states
+IN_FORMATION = 0
+DIVING = 1
+RESETTING = 2
+DESTROYED = 3
+STATE_NAMES = ("IN_FORMATION", "DIVING", "RESETTING", "DESTROYED")
+# The states each state is allowed to change to
+TRANSITIONS = {IN_FORMATION: (DIVING, DESTROYED),
+               DIVING: (RESETTING, IN_FORMATION, DESTROYED),
+               RESETTING: (IN_FORMATION, DESTROYED),
+               DESTROYED: ()}
+
+
+def formation_positions(rows, field_width):
+    """
+    Method works out where the ships of a new fleet go, in rows of evenly spaced ships
+    :param rows: a list or tuple where each entry specifies the number of ships in that row
+    :param field_width: the width of the playing field
+    :return: a list of tuples with the coordinates of the top left of each ship
+    """
+    positions = []
+    for row_index in range(len(rows)):
+        for i in range(rows[row_index]):
+            positions.append(((1 + i) * field_width/(1 + rows[row_index]), 30*(1 + row_index)))
+    return positions
+
+
+def dive_path(x, y, width, target, field_width, field_height):
+    """
+    Method works out the curve a ship follows when it starts diving at the player. The ship swoops out on the side away
+    from the target, so ships to the left of the player loop out to the left, and its centre comes down through the
+    target at the end of the curve.
+    :param x: the x coordinate of the top left of the ship
+    :param y: the y coordinate of the top left of the ship
+    :param width: the width of the ship
+    :param target: a tuple with the coordinates the centre of the ship dives through, the centre of the player's hit
+    circle
+    :param field_width: the width of the playing field
+    :param field_height: the height of the playing field
+    :return: a tuple of the curve as a (4, 2) array of the coefficients of t^0 to t^3, and how much the ship's progress
+    along it goes up by each step
+    """
+    # The curve is followed by the top left corner of the ship, so it ends half a ship up and left of the target
+    end_x = target[0] - width / 2
+    end_y = target[1] - width / 2
+    loop_width = LOOP_WIDTH * field_width
+    loop_height = LOOP_HEIGHT * field_height
+    side = -1 if x < end_x else 1
+    points = np.array([(x, y),
+                       (x + side * loop_width, y - loop_height),
+                       (end_x, end_y - loop_height),
+                       (end_x, end_y)])
+    # The curve is about as long as the average of its chord and the path through its control points
+    lengths = np.hypot(*np.diff(points, axis=0).T)
+    length = (lengths.sum() + np.hypot(*(points[3] - points[0]))) / 2
+    return BEZIER_TO_POWER @ points, DIVE_SPEED / max(length, DIVE_SPEED)
+
+
+class Fleet:
+    """
+    Class to represent the enemy fleet as a structure of arrays
+    Instance variables:
+    x, y - float arrays with the coordinates of the top left of each ship
+    xspeed, yspeed - float arrays with the velocity of each ship
+    init_x, init_y - float arrays with the place of each ship in the formation
+    value - int array with how many points each ship is worth
+    state - uint8 array with the state of each ship
+    path - float array of shape (ships, 4, 2) with each diving ship's curve as the coefficients of t^0 to t^3
+    progress - float array with how far along its curve each diving ship is, from 0 to 1
+    path_step - float array with how much each diving ship's progress goes up by each step
+    members - a dictionary mapping each state to the set of indices of the ships in that state
+    offset - how far the formation has swayed from where it started
+    width - the width of every ship
+    sway_speed - how far the formation sways each step
+    """
+    def __init__(self, sway_speed=FLEET_SWAY_SPEED):
+        """
+        Constructor for Fleet
+        Creates an empty fleet.
+        :param sway_speed: how far the formation sways each step
+        """
+        self.width = SHIP_WIDTH
+        self.sway_speed = sway_speed
+        self.offset = 0.0
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        self.xspeed = np.zeros(0)
+        self.yspeed = np.zeros(0)
+        self.init_x = np.zeros(0)
+        self.init_y = np.zeros(0)
+        self.value = np.zeros(0, dtype=np.int64)
+        self.state = np.zeros(0, dtype=np.uint8)
+        self.path = np.zeros((0, 4, 2))
+        self.progress = np.zeros(0)
+        self.path_step = np.zeros(0)
+        self.members = {state: set() for state in TRANSITIONS}
+
+    def __len__(self):
+        """
+        Method returns the number of ships that haven't been destroyed
+        :return: an int
+        """
+        return len(self.state) - len(self.members[DESTROYED])
+
+    def copy(self):
+        """
+        Method returns a copy of the fleet that shares no arrays with it
+        :return: a Fleet
+        """
+        fleet = Fleet(self.sway_speed)
+        fleet.width = self.width
+        fleet.offset = self.offset
+        for name in ("x", "y", "xspeed", "yspeed", "init_x", "init_y", "value", "state", "path", "progress",
+                     "path_step"):
+            setattr(fleet, name, getattr(self, name).copy())
+        fleet.members = {state: set(indices) for state, indices in self.members.items()}
+        return fleet
+
+    def add_ships(self, positions, val, sway_direction=True):
+        """
+        Method replaces the fleet with ships at the positions provided
+        :param positions: a list of tuples with the coordinates of the top left of each ship
+        :param val: the value of each ship (how many points are received for destroying it)
+        :param sway_direction: True if the fleet is swaying right, False if it is swaying left
+        :return: None
+        """
+        count = len(positions)
+        coordinates = np.array(positions, dtype=float).reshape(count, 2)
+        self.x = coordinates[:, 0].copy()
+        self.y = coordinates[:, 1].copy()
+        self.init_x = self.x.copy()
+        self.init_y = self.y.copy()
+        self.xspeed = np.full(count, (-1 + (2 * sway_direction)) * self.sway_speed)
+        self.yspeed = np.zeros(count)
+        self.value = np.full(count, val, dtype=np.int64)
+        self.state = np.full(count, IN_FORMATION, dtype=np.uint8)
+        self.path = np.zeros((count, 4, 2))
+        self.progress = np.zeros(count)
+        self.path_step = np.zeros(count)
+        self.members = {state: set() for state in TRANSITIONS}
+        self.members[IN_FORMATION].update(range(count))
+        self.offset = 0.0
+
+    def generate(self, rows, field_width, val=10, sway_direction=True):
+        """
+        Method generates a new fleet with rows of evenly spaced ships
+        :param rows: a list or tuple where each entry specifies the number of ships in that row
+        :param field_width: the width of the playing field
+        :param val: the value of each ship
+        :param sway_direction: True if the fleet is swaying right, False if it is swaying left
+        :return: None
+        """
+        self.add_ships(formation_positions(rows, field_width), val, sway_direction)
+
+    def reset_formation(self, sway_direction):
+        """
+        Method puts every remaining ship back in its starting place in the formation
+        :param sway_direction: True if the fleet is swaying right, False if it is swaying left
+        :return: None
+        """
+        self.x[:] = self.init_x
+        self.y[:] = self.init_y
+        self.xspeed[self.state != DESTROYED] = (-1 + (2 * sway_direction)) * self.sway_speed
+        self.yspeed[:] = 0
+        members = self.members
+        members[IN_FORMATION].update(members[DIVING], members[RESETTING])
+        members[DIVING].clear()
+        members[RESETTING].clear()
+        self.state[self.state != DESTROYED] = IN_FORMATION
+        self.offset = 0.0
+
+    def set_state(self, index, state):
+        """
+        Method moves a ship into a new state
+        :param index: the index of the ship
+        :param state: the state to move it into
+        :return: None
+        """
+        index = int(index)
+        old = int(self.state[index])
+        if state not in TRANSITIONS[old]:
+            raise ValueError("Ship %d can't go from %s to %s" % (index, STATE_NAMES[old], STATE_NAMES[state]))
+        self.members[old].discard(index)
+        self.members[state].add(index)
+        self.state[index] = state
+
+    def get_state(self, index):
+        """
+        Method returns the state of a ship
+        :param index: the index of the ship
+        :return: one of IN_FORMATION, DIVING, RESETTING or DESTROYED
+        """
+        return int(self.state[index])
+
+    def indices(self, state):
+        """
+        Method returns the indices of the ships in a state, in order
+        :param state: one of IN_FORMATION, DIVING, RESETTING or DESTROYED
+        :return: an int array
+        """
+        members = self.members[state]
+        return np.sort(np.fromiter(members, dtype=np.intp, count=len(members)))
+
+    def alive_mask(self):
+        """
+        Method returns which ships haven't been destroyed
+        :return: a bool array
+        """
+        return self.state != DESTROYED
+
+    def alive_indices(self):
+        """
+        Method returns the indices of the ships that haven't been destroyed
+        :return: an int array
+        """
+        return np.flatnonzero(self.state != DESTROYED)
+
+    def positions(self):
+        """
+        Method returns the positions of the ships that haven't been destroyed
+        :return: a list of (x, y) tuples
+        """
+        alive = self.state != DESTROYED
+        return list(zip(self.x[alive].tolist(), self.y[alive].tolist()))
+
+    def get_position(self, index):
+        """
+        Method returns the position of a ship
+        :param index: the index of the ship
+        :return: a tuple representing the position of the ship
+        """
+        return float(self.x[index]), float(self.y[index])
+
+    def get_value(self, index):
+        """
+        Method returns the value of a ship
+        :param index: the index of the ship
+        :return: an int representing the value of the ship
+        """
+        return int(self.value[index])
+
+    def get_width(self):
+        """
+        Method returns the width of the ships
+        :return: an int representing the width of a ship
+        """
+        return self.width
+
+    def drop(self, index, target, field_width, field_height):
+        """
+        Method makes a ship in the formation start diving at the player, working out the curve it will follow (see
+        dive_path). Ships that are already diving or flying back are left alone.
+        :param index: the index of the ship
+        :param target: a tuple with the coordinates the centre of the ship dives through, the centre of the player's hit
+        circle
+        :param field_width: the width of the playing field
+        :param field_height: the height of the playing field
+        :return: None
+        """
+        if self.state[index] != IN_FORMATION:
+            return
+        self.set_state(index, DIVING)
+        self.path[index], self.path_step[index] = dive_path(float(self.x[index]), float(self.y[index]), self.width,
+                                                            target, field_width, field_height)
+        self.progress[index] = 0.0
+
+    def destroy(self, index):
+        """
+        Method removes a ship from the fleet
+        :param index: the index of the ship
+        :return: None
+        """
+        self.set_state(index, DESTROYED)
+        self.xspeed[index] = 0
+        self.yspeed[index] = 0
+
+    def update(self, target, field_height, sway_direction):
+        """
+        Method moves the whole fleet by one step. Ships in the formation sway with it, diving ships move along their
+        curves and then straight down, ships that have fallen off the bottom of the screen come back in from the top,
+        and ships flying back head for their place in the formation.
+        :param target: a tuple with the coordinates of the centre of the player's hit circle, which the end of each diving
+        ship's curve moves towards by up to AIM_SPEED
+        :param field_height: the height of the playing field
+        :param sway_direction: True if the fleet is swaying right, False if it is swaying left
+        :return: None
+        """
+        if len(self.x) == 0:
+            return
+        sway_speed = (-1 + (2 * sway_direction)) * self.sway_speed
+        self.xspeed[self.state != DESTROYED] = sway_speed
+
+        # Move the diving ships along their curves, and straight down once they have come to the end of them
+        diving = self.indices(DIVING)
+        if len(diving) > 0:
+            path = self.path[diving]
+            # Move the ends of the curves towards where the player is now. The end is the sum of the coefficients, and
+            # moving the last two control points across by d adds 3d to the t^2 coefficient and takes 2d off the t^3
+            # coefficient.
+            shift = np.maximum(np.minimum(target[0] - self.width / 2 - path[:, :, 0].sum(axis=1), AIM_SPEED),
+                               -AIM_SPEED)
+            path[:, 2, 0] += 3 * shift
+            path[:, 3, 0] -= 2 * shift
+            self.path[diving] = path
+            progress = self.progress[diving]
+            t = np.minimum(progress + self.path_step[diving], 1.0)
+            self.progress[diving] = t
+            s = t[:, None]
+            points = ((path[:, 3] * s + path[:, 2]) * s + path[:, 1]) * s + path[:, 0]
+            # Set the velocity that takes each ship to its next point on the curve, or straight down past its end
+            ended = progress >= 1.0
+            self.xspeed[diving] = np.where(ended, 0, points[:, 0] - self.x[diving])
+            self.yspeed[diving] = np.where(ended, DIVE_SPEED, points[:, 1] - self.y[diving])
+            # Send them back to the top if they have gone off the bottom of the screen
+            fallen = diving[self.y[diving] > field_height]
+            self.y[fallen] = -self.width
+            self.yspeed[fallen] = 0
+            for index in fallen.tolist():
+                self.set_state(index, RESETTING)
+
+        # Have the resetting ships fly back to their place in the formation
+        resetting = self.indices(RESETTING)
+        if len(resetting) > 0:
+            desired_x = self.init_x[resetting] + self.offset
+            desired_y = self.init_y[resetting]
+            x = self.x[resetting]
+            y = self.y[resetting]
+            dx = desired_x - x
+            dy = desired_y - y
+            self.xspeed[resetting] = np.where(dx != 0, np.sign(dx) * RESET_SPEED, sway_speed)
+            self.yspeed[resetting] = np.where(dy != 0, np.sign(dy) * RESET_SPEED, self.yspeed[resetting])
+            x = np.where(np.abs(dx) < SNAP_DISTANCE, desired_x, x)
+            y = np.where(np.abs(dy) < SNAP_DISTANCE, desired_y, y)
+            self.x[resetting] = x
+            self.y[resetting] = y
+            arrived = resetting[(x == desired_x) & (y == desired_y)]
+            self.xspeed[arrived] = sway_speed
+            self.yspeed[arrived] = 0
+            for index in arrived.tolist():
+                self.set_state(index, IN_FORMATION)
+
+        # Move every ship, keeping the ships in the formation exactly in their places
+        self.offset += sway_speed
+        self.x += self.xspeed
+        self.y += self.yspeed
+        formation = self.state == IN_FORMATION
+        self.x[formation] = self.init_x[formation] + self.offset
@@ -0,0 +1,118 @@
+"""
+Screen layout and window scaling.
+
+Everything on screen is placed at a fraction of the width and height of the playing field. A Layout works all of those
+positions out once for the field's size, so drawing a frame only has to look them up.
+
+The playing field keeps the size it was given at startup for the whole game, so the simulation and the layout never
+change. When the window can be resized, each frame is drawn onto a Surface of the field's size and a ScaledDisplay
+stretches it to fit the window, keeping its shape and filling the rest with black bars. The rectangle it is stretched
+into is only worked out again when the window changes size.
+"""
+# Imports
+import pygame
+
+# Constants
+HEIGHT_MULTIPLIER = 0.6     # Height of the window as a fraction of the height of the screen
+H_TO_W_MULTIPLIER = 0.8     # Width of the window as a fraction of its height
+HEART_SPACING = 30  # Distance between the hearts showing the player's lives
+HEART_WIDTH = 20    # Width of a heart
+MAX_HEARTS = 10     # Most hearts that positions are worked out for
+INITIALS_LENGTH = 3     # Number of letters in a player's initials
+BAR_COLOR = (0, 0, 0)   # Colour of the bars beside or above a scaled frame
+
+
+def window_size(screen_height):
+    """
+    Method works out the size of the window from the height of the screen it is shown on
+    :param screen_height: the height of the screen in pixels
+    :return: a tuple of the width and height of the window
+    """
+    height = int(screen_height * HEIGHT_MULTIPLIER)
+    return int(height * H_TO_W_MULTIPLIER), height
+
+
+class Layout:
+    """
+    Class to represent where everything goes on the screen, worked out once for the size of the playing field
+    Instance variables:
+    width, height - the size of the playing field
+    score - the centre of the score during the game
+    hearts - a list of the top left corners of the hearts showing the player's lives
+    explosion_offset - where the explosion image goes relative to the bottom left corner of the player's ship
+    profile - the top left corner of the profiler overlay
+    start_title, start_author, start_how_to_1, start_how_to_2, start_instructions - the centres of the start screen's
+    lines of text
+    lost_message, lost_score_label, lost_score - the centres of the lost screen's lines of text
+    continue_message - the centre of the text on the screen between levels
+    initials_message - the centre of the prompt to enter initials
+    initials_letters - a list of the centres of each letter of the initials
+    """
+    def __init__(self, width, height):
+        """
+        Two argument constructor for Layout
+        :param width: the width of the playing field
+        :param height: the height of the playing field
+        """
+        self.width = width
+        self.height = height
+        self.score = (width * 0.9, height * 0.95)
+        self.hearts = [(0.05 * width + (HEART_SPACING * i), .95 * height) for i in range(MAX_HEARTS)]
+        self.explosion_offset = (-0.07 * width, -0.09 * height)
+        self.profile = (5, 5)
+        self.start_title = (width * 0.5, height * 0.5)
+        self.start_author = (width * 0.5, height * 0.6)
+        self.start_how_to_1 = (width * 0.5, height * 0.7)
+        self.start_how_to_2 = (width * 0.5, height * 0.75)
+        self.start_instructions = (width * 0.5, height * 0.9)
+        self.lost_message = (width * 0.5, height * 0.3)
+        self.lost_score_label = (width * 0.5, height * 0.5)
+        self.lost_score = (width * 0.5, height * 0.75)
+        self.continue_message = (width * 0.5, height * 0.5)
+        self.initials_message = (width * 0.5, height * 0.3)
+        self.initials_letters = [(width * ((i + 2) / 6), height * 0.5) for i in range(INITIALS_LENGTH)]
+
+
+class ScaledDisplay:
+    """
+    Class to represent a window that shows frames drawn at a fixed size, stretched to fit whatever size the window is
+    Instance variables:
+    frame - the Surface the game draws each frame onto, the size of the playing field
+    window - the display Surface
+    target - the subsurface of the window the frame is stretched into
+    """
+    def __init__(self, size, window):
+        """
+        Two argument constructor for ScaledDisplay
+        :param size: a tuple with the width and height of the playing field
+        :param window: the display Surface
+        """
+        self.frame = pygame.Surface(size).convert()
+        self.window = None
+        self.target = None
+        self.resize(window)
+
+    def resize(self, window):
+        """
+        Method works out where frames go in the window after it changes size
+        :param window: the display Surface
+        :return: None
+        """
+        self.window = window
+        width, height = self.frame.get_size()
+        window_width, window_height = window.get_size()
+        scale = min(window_width / width, window_height / height)
+        rect = pygame.Rect(0, 0, max(1, int(width * scale)), max(1, int(height * scale)))
+        rect.center = (window_width // 2, window_height // 2)
+        window.fill(BAR_COLOR)
+        self.target = window.subsurface(rect)
+
+    def present(self):
+        """
+        Method stretches the frame into the window. The display still has to be updated afterwards.
+        :return: None
+        """
+        if self.target.get_size() == self.frame.get_size():
+            self.target.blit(self.frame, (0, 0))
+        else:
+            pygame.transform.scale(self.frame, self.target.get_size(), self.target)
@@ -0,0 +1,473 @@
+"""
+Storage for the leaderboard.
+
+Every score is kept in leaderboard.txt, one "INITIALS SCORE DAY" line each. New scores are appended to the end of the
+file, so saving a score never rewrites what is already there, and a crash can at worst lose the line being written.
+Every so often the file is compacted: the scores worth keeping are rewritten in order into a temporary file that then
+replaces the old one in a single rename, so the file on disk is always either the old version or the new one. Because a
+compacted file is sorted, its first lines are the top scores, and files written before the day was stored still load.
+
+The file is only read once. After that, queries are answered from indexes kept in memory. Writing can be handed to a
+background thread, so saving a score never makes the game wait on the disk; the thread writes whatever scores have
+queued up together and syncs them to disk once.
+"""
+# Imports
+import bisect
+import os
+import queue
+import tempfile
+import threading
+import time
+
+# Constants
+LEADERBOARD_FILE = "leaderboard.txt"    # File the leaderboard is stored in
+COMPACT_EVERY = 100     # Number of appended scores after which the file is compacted
+KEEP = 1000     # Number of top scores kept by compaction, on top of each player's best and each day's top scores
+DAY_SIZE = 10   # Number of scores kept for each day's board
+CAPACITY = 10   # Default number of scores kept by a top scores list
+BATCH_DELAY = 0.05  # Seconds the background writer waits for more scores so it can sync them to disk together
+
+
+def today():
+    """
+    Method returns the current day in the form the leaderboard stores it
+    :return: a string such as "2024-01-31"
+    """
+    return time.strftime("%Y-%m-%d")
+
+
+def parse_entry(line):
+    """
+    Method reads an entry from a line of the leaderboard file
+    :param line: a line of the file
+    :return: a tuple of the initials, score, and day (an empty string for old entries without one), or None if the
+    line isn't a complete entry
+    """
+    parts = line.split()
+    if len(parts) < 2:
+        return None
+    try:
+        score = int(parts[1])
+    except ValueError:
+        return None
+    return parts[0], score, parts[2] if len(parts) > 2 else ""
+
+
+def format_entry(entry):
+    """
+    Method turns an entry into a line of the leaderboard file
+    :param entry: a tuple of the initials, score, and day
+    :return: a string ending in a newline
+    """
+    return " ".join(str(part) for part in entry if part != "") + "\n"
+
+
+def read_leaderboard(filename):
+    """
+    Method reads in the leaderboard from the filename and returns a list of the entries in the order they are in the
+    file. Lines that aren't complete entries, like one cut short by a crash, are skipped.
+    :param filename: the name of the file where the leaderboard is stored
+    :return: a list of tuples containing the initials, score, and day of each entry
+    """
+    entries = []
+    with open(filename) as f:
+        for line in f:
+            entry = parse_entry(line)
+            if entry is not None:
+                entries.append(entry)
+    return entries
+
+
+def append_leaderboard(filename, entries):
+    """
+    Method adds entries to the end of a leaderboard file and waits until they are safely on disk
+    :param filename: the name of the file to add to
+    :param entries: a list of tuples containing the initials, score, and day of each entry
+    :return: None
+    """
+    with open(filename, "a") as f:
+        f.writelines(format_entry(entry) for entry in entries)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def write_leaderboard(filename, entries):
+    """
+    Method replaces a leaderboard file with the entries provided. The entries are written to a temporary file first,
+    which is renamed over the old file once it is safely on disk.
+    :param filename: the name of the file to write
+    :param entries: a list of tuples containing the initials, score, and day of each entry
+    :return: None
+    """
+    directory = os.path.dirname(os.path.abspath(filename))
+    descriptor, temporary = tempfile.mkstemp(prefix=".leaderboard-", dir=directory)
+    try:
+        with os.fdopen(descriptor, "w") as f:
+            f.writelines(format_entry(entry) for entry in entries)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, filename)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+class TopScores:
+    """
+    Class to represent the top scores out of any number of submitted scores, kept in order so a score's rank can be
+    found with a binary search
+    Instance variables:
+    capacity - the number of scores kept
+    keys - a sorted list of (-score, sequence number) keys, highest score first and earliest first among equal scores
+    entries - a dictionary mapping sequence numbers to (initials, score) tuples
+    submitted - the number of scores submitted, used as the next sequence number
+    """
+    def __init__(self, capacity=CAPACITY, scores=()):
+        """
+        Constructor for TopScores
+        :param capacity: the number of scores to keep
+        :param scores: a list of (initials, score) tuples to start with
+        """
+        self.capacity = capacity
+        self.keys = []
+        self.entries = {}
+        self.submitted = 0
+        for initials, score in scores:
+            self.insert(initials, score)
+
+    def rank(self, score):
+        """
+        Method works out the rank a score would get without adding it
+        :param score: the score
+        :return: the rank the score would get, counting from 1, or None if it wouldn't be kept
+        """
+        position = bisect.bisect_left(self.keys, (-score, self.submitted))
+        return position + 1 if position < self.capacity else None
+
+    def insert(self, initials, score):
+        """
+        Method submits a score, dropping the lowest score if there are now too many
+        :param initials: the player's initials
+        :param score: the score
+        :return: the rank of the score, counting from 1, or None if it wasn't kept
+        """
+        rank = self.rank(score)
+        sequence = self.submitted
+        self.submitted += 1
+        if rank is None:
+            return None
+        self.keys.insert(rank - 1, (-score, sequence))
+        self.entries[sequence] = (initials, score)
+        if len(self.keys) > self.capacity:
+            del self.entries[self.keys.pop()[1]]
+        return rank
+
+    def top(self, n=None):
+        """
+        Method returns the highest scores
+        :param n: the number of scores to return, or None for all of them
+        :return: a list of (initials, score) tuples, highest first
+        """
+        return [self.entries[sequence] for _, sequence in self.keys[:n]]
+
+    def __len__(self):
+        """
+        Method returns the number of scores kept
+        :return: the number of scores
+        """
+        return len(self.keys)
+
+
+class LeaderboardWriter:
+    """
+    Class to represent a background thread that does the writing for a leaderboard file, so the game never waits on the
+    disk. Requests are handled in the order they are made. Scores that queue up while the thread is busy, or within
+    BATCH_DELAY of each other, are appended together with a single sync to disk.
+    Instance variables:
+    filename - the name of the leaderboard file
+    requests - a Queue of ("append", entry) and ("replace", entries) requests, with None to stop the thread
+    error - the last OSError the thread ran into, or None
+    failed - a list of the requests that couldn't be written, to try again with the next batch
+    """
+    def __init__(self, filename, batch_delay=BATCH_DELAY):
+        """
+        Constructor for LeaderboardWriter
+        Starts the thread.
+        :param filename: the name of the leaderboard file
+        :param batch_delay: the seconds to wait for more scores before writing
+        """
+        self.filename = filename
+        self.batch_delay = batch_delay
+        self.requests = queue.Queue()
+        self.error = None
+        self.failed = []
+        self.thread = threading.Thread(target=self.run, name="leaderboard-writer", daemon=True)
+        self.thread.start()
+
+    def append(self, entry):
+        """
+        Method queues an entry to be added to the end of the file
+        :param entry: a tuple of the initials, score, and day
+        :return: None
+        """
+        self.requests.put(("append", entry))
+
+    def replace(self, entries):
+        """
+        Method queues the file to be replaced with a list of entries
+        :param entries: a list of tuples containing the initials, score, and day of each entry
+        :return: None
+        """
+        self.requests.put(("replace", entries))
+
+    def flush(self):
+        """
+        Method waits until everything queued so far has been written
+        :return: None
+        """
+        self.requests.join()
+
+    def close(self):
+        """
+        Method writes everything queued so far and stops the thread
+        :return: None
+        """
+        self.requests.put(None)
+        self.thread.join()
+
+    def run(self):
+        """
+        Method handles requests until it is told to stop
+        :return: None
+        """
+        stopping = False
+        while not stopping:
+            batch = [self.requests.get()]
+            if batch[0] is not None:
+                time.sleep(self.batch_delay)
+            while True:
+                try:
+                    batch.append(self.requests.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = None in batch
+            try:
+                self.write([request for request in batch if request is not None])
+            finally:
+                for _ in batch:
+                    self.requests.task_done()
+
+    def write(self, batch):
+        """
+        Method carries out a batch of requests, along with any that failed last time. A replacement holds every entry
+        queued before it, so only the last replacement and the entries appended after it have to be written.
+        :param batch: a list of requests
+        :return: None
+        """
+        replacement = None
+        appends = []
+        for kind, value in self.failed + batch:
+            if kind == "replace":
+                replacement = value
+                appends = []
+            else:
+                appends.append(value)
+        try:
+            if replacement is not None:
+                write_leaderboard(self.filename, replacement)
+                replacement = None
+            if len(appends) > 0:
+                append_leaderboard(self.filename, appends)
+            self.failed = []
+        except OSError as error:
+            # Try again with the next batch; the scores are still in memory
+            self.error = error
+            self.failed = [("append", entry) for entry in appends]
+            if replacement is not None:
+                self.failed.insert(0, ("replace", replacement))
+
+
+class LeaderboardStore:
+    """
+    Class to represent the leaderboard file and the indexes used to answer queries about it
+    Instance variables:
+    filename - the name of the leaderboard file
+    compact_every - the number of appended scores after which the file is compacted
+    keep - the number of top scores kept by compaction
+    day_size - the number of scores kept for each day by compaction
+    order - a sorted list of (-score, sequence number) keys, one for each entry, highest score first and earliest first
+    among equal scores
+    entries - a dictionary mapping sequence numbers to (initials, score, day) tuples
+    bests - a dictionary mapping initials to the sequence number of that player's best entry
+    days - a dictionary mapping days to sorted lists of the keys of that day's entries
+    appended - the number of scores appended since the file was last compacted. When the file is loaded it is the
+    number of scores compaction would drop, so scores appended over many short sessions still lead to a compaction.
+    writer - the LeaderboardWriter doing the writing in the background, or None to write straight away
+    """
+    def __init__(self, filename=LEADERBOARD_FILE, compact_every=COMPACT_EVERY, keep=KEEP, day_size=DAY_SIZE,
+                 background=False):
+        """
+        Constructor for LeaderboardStore
+        Loads the leaderboard file, if there is one.
+        :param filename: the name of the leaderboard file
+        :param compact_every: the number of appended scores after which the file is compacted
+        :param keep: the number of top scores kept by compaction
+        :param day_size: the number of scores kept for each day by compaction
+        :param background: True to write the file on a background thread
+        """
+        self.filename = filename
+        self.compact_every = compact_every
+        self.keep = keep
+        self.day_size = day_size
+        self.order = []
+        self.entries = {}
+        self.bests = {}
+        self.days = {}
+        self.appended = 0
+        self.load()
+        self.writer = LeaderboardWriter(filename) if background else None
+
+    def load(self):
+        """
+        Method reads the leaderboard file into memory, replacing anything already loaded
+        :return: None
+        """
+        self.rebuild(read_leaderboard(self.filename) if os.path.exists(self.filename) else [])
+        self.appended = len(self.entries) - len(self.kept())
+
+    def rebuild(self, entries):
+        """
+        Method replaces the indexes with ones for a list of entries
+        :param entries: a list of tuples containing the initials, score, and day of each entry
+        :return: None
+        """
+        self.order = []
+        self.entries = {}
+        self.bests = {}
+        self.days = {}
+        self.appended = 0
+        for entry in entries:
+            self.index(entry)
+
+    def index(self, entry):
+        """
+        Method adds an entry to the indexes
+        :param entry: a tuple of the initials, score, and day
+        :return: None
+        """
+        sequence = len(self.entries)
+        self.entries[sequence] = entry
+        key = (-entry[1], sequence)
+        bisect.insort(self.order, key)
+        bisect.insort(self.days.setdefault(entry[2], []), key)
+        best = self.bests.get(entry[0])
+        if best is None or entry[1] > self.entries[best][1]:
+            self.bests[entry[0]] = sequence
+
+    def add(self, initials, score, day=None):
+        """
+        Method saves a score, appending it to the leaderboard file, and compacts the file if enough scores have been
+        appended since it last was. With a background writer the score is in the indexes straight away and written
+        to the file shortly after.
+        :param initials: the player's initials
+        :param score: the score
+        :param day: the day the score was set, defaulting to today
+        :return: the score's rank among all the scores, counting from 1
+        """
+        entry = (initials, score, today() if day is None else day)
+        rank = self.rank(score)
+        self.index(entry)
+        if self.writer is not None:
+            self.writer.append(entry)
+        else:
+            append_leaderboard(self.filename, [entry])
+        self.appended += 1
+        if self.appended >= self.compact_every:
+            self.compact()
+        return rank
+
+    def rank(self, score):
+        """
+        Method works out the rank a new score would get among all the scores without saving it
+        :param score: the score
+        :return: the rank the score would get, counting from 1
+        """
+        return bisect.bisect_left(self.order, (-score, len(self.entries))) + 1
+
+    def top(self, n=10):
+        """
+        Method returns the highest scores
+        :param n: the number of scores to return
+        :return: a list of (initials, score) tuples, highest first
+        """
+        return [self.entries[sequence][:2] for _, sequence in self.order[:n]]
+
+    def player_bests(self, n=10):
+        """
+        Method returns the best score of each player, for a board where every player only appears once
+        :param n: the number of players to return
+        :return: a list of (initials, score) tuples, highest first
+        """
+        keys = sorted((-self.entries[sequence][1], sequence) for sequence in self.bests.values())
+        return [self.entries[sequence][:2] for _, sequence in keys[:n]]
+
+    def player_best(self, initials):
+        """
+        Method returns a player's best score
+        :param initials: the player's initials
+        :return: the score, or None if the player has no scores
+        """
+        best = self.bests.get(initials)
+        return None if best is None else self.entries[best][1]
+
+    def day_top(self, day=None, n=10):
+        """
+        Method returns the highest scores set on a day
+        :param day: the day, defaulting to today
+        :param n: the number of scores to return
+        :return: a list of (initials, score) tuples, highest first
+        """
+        keys = self.days.get(today() if day is None else day, [])
+        return [self.entries[sequence][:2] for _, sequence in keys[:n]]
+
+    def kept(self):
+        """
+        Method works out which scores compaction keeps: the top scores, each player's best score, and the top scores of
+        each day
+        :return: a set of the sequence numbers of the entries kept
+        """
+        kept = set(sequence for _, sequence in self.order[:self.keep])
+        kept.update(self.bests.values())
+        for keys in self.days.values():
+            kept.update(sequence for _, sequence in keys[:self.day_size])
+        return kept
+
+    def compact(self):
+        """
+        Method rewrites the leaderboard file in order, keeping only the scores from kept, then rebuilds the indexes from
+        what was kept
+        :return: None
+        """
+        kept = self.kept()
+        entries = [self.entries[sequence] for _, sequence in self.order if sequence in kept]
+        if self.writer is not None:
+            self.writer.replace(entries)
+        else:
+            write_leaderboard(self.filename, entries)
+        self.rebuild(entries)
+
+    def close(self):
+        """
+        Method finishes writing anything still waiting to be written. Call it before the program exits.
+        :return: None
+        """
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def __len__(self):
+        """
+        Method returns the number of scores in the leaderboard
+        :return: the number of scores
+        """
+        return len(self.order)
@@ -0,0 +1,358 @@
+"""
+Leaderboard service shared by several cabinets.
+
+The server keeps the global top scores. Cabinets hold a connection open to it, send the scores their players set in
+batches, and get every change to the global board pushed back as a delta, so each cabinet always has a copy of the
+board to look ranks up in. Messages are JSON objects, one per line:
+    server to cabinet: {"type": "board", "capacity": K, "scores": [[initials, score], ...]} when a cabinet connects
+    cabinet to server: {"type": "submit", "scores": [[initials, score, day], ...]} with initials of one to three
+        capital letters and the day as YYYY-MM-DD; any other entry is dropped
+    server to cabinet: {"type": "delta", "version": n, "scores": [[initials, score], ...]} for the scores that made it
+    onto the board, in the order they were added
+
+The client runs its own event loop on a background thread, so submitting a score only appends it to a queue and never
+waits on the network. While the server can't be reached, scores wait in the queue and are sent once the client
+reconnects; the cabinet still saves every score to its own leaderboard file, so nothing depends on the service.
+
+Run a server on this machine with:
+    python leaderboard_server.py --port 8765
+"""
+# Imports
+import argparse
+import asyncio
+import json
+import re
+import threading
+from collections import deque
+from leaderboard import LeaderboardStore, TopScores, today
+
+# Constants
+DEFAULT_HOST = "127.0.0.1"  # Address the server listens on and the client connects to by default
+DEFAULT_PORT = 8765     # Port the server listens on and the client connects to by default
+CAPACITY = 1000     # Number of scores on the global board
+BATCH_SIZE = 32     # Most scores sent in one message
+BATCH_DELAY = 0.5   # Seconds the client waits for more scores before sending a batch
+RECONNECT_DELAY = 2     # Seconds the client waits before trying to reconnect
+MAX_PENDING = 1000  # Most scores the client holds on to while it can't reach the server
+INITIALS = re.compile("[A-Z]{1,3}")     # Initials a cabinet can submit, as entered on the initials screen
+DAY = re.compile("[0-9]{4}-[0-9]{2}-[0-9]{2}")  # Day a score was set, in the form leaderboard.today gives it
+
+
+def encode(message):
+    """
+    Method turns a message into a line of the protocol
+    :param message: a dictionary
+    :return: the bytes to send
+    """
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+
+def parse_address(address):
+    """
+    Method splits a "host:port" string
+    :param address: a string such as "127.0.0.1:8765", or just a host
+    :return: a tuple of the host and the port
+    """
+    host, _, port = address.rpartition(":")
+    if not host:
+        return port or DEFAULT_HOST, DEFAULT_PORT
+    return host, int(port)
+
+
+class LeaderboardServer:
+    """
+    Class to represent the service that merges the scores from every cabinet into the global board
+    Instance variables:
+    board - the TopScores holding the global board
+    store - the LeaderboardStore every submitted score is saved to, or None to keep the board in memory only
+    version - the number of deltas sent so far
+    writers - a set of the StreamWriters of the connected cabinets
+    """
+    def __init__(self, capacity=CAPACITY, store=None):
+        """
+        Constructor for LeaderboardServer
+        :param capacity: the number of scores on the global board
+        :param store: a LeaderboardStore to save every score to and to load the board from, or None
+        """
+        self.board = TopScores(capacity, store.top(capacity) if store is not None else ())
+        self.store = store
+        self.version = 0
+        self.writers = set()
+
+    async def handle(self, reader, writer):
+        """
+        Method looks after the connection to one cabinet, sending it the board and taking in its submissions until it
+        disconnects
+        :param reader: the StreamReader of the connection
+        :param writer: the StreamWriter of the connection
+        :return: None
+        """
+        self.writers.add(writer)
+        try:
+            writer.write(encode({"type": "board", "version": self.version, "capacity": self.board.capacity,
+                                 "scores": self.board.top()}))
+            await writer.drain()
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(message, dict) and message.get("type") == "submit":
+                    self.submit(message.get("scores", []))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.writers.discard(writer)
+            writer.close()
+
+    def submit(self, scores):
+        """
+        Method merges a batch of scores into the board and sends the ones that made it to every cabinet. Entries whose
+        initials or day aren't in the form a cabinet sends them are skipped, since they would break the lines of the
+        leaderboard file.
+        :param scores: a list of [initials, score, day] lists
+        :return: a list of the [initials, score] lists that made it onto the board
+        """
+        added = []
+        for entry in scores:
+            try:
+                initials, score, day = entry[0], int(entry[1]), entry[2]
+                if INITIALS.fullmatch(initials) is None or DAY.fullmatch(day) is None:
+                    continue
+            except (IndexError, TypeError, ValueError):
+                continue
+            if self.store is not None:
+                self.store.add(initials, score, day)
+            if self.board.insert(initials, score) is not None:
+                added.append([initials, score])
+        if len(added) > 0:
+            self.version += 1
+            data = encode({"type": "delta", "version": self.version, "scores": added})
+            for writer in list(self.writers):
+                writer.write(data)
+        return added
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """
+        Method starts listening for cabinets
+        :param host: the address to listen on
+        :param port: the port to listen on, or 0 to pick a free one
+        :return: the asyncio Server
+        """
+        return await asyncio.start_server(self.handle, host, port)
+
+
+class LeaderboardClient:
+    """
+    Class to represent a cabinet's connection to the leaderboard service, kept up by a background thread
+    Instance variables:
+    host, port - the address of the server
+    batch_size - the most scores sent in one message
+    batch_delay - the seconds to wait for more scores before sending a batch
+    pending - a deque of [initials, score, day] lists waiting to be sent
+    board - a TopScores with this cabinet's copy of the global board, or None before the first connection
+    connected - True while there is a connection to the server
+    closing - True once close has been called
+    """
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, batch_size=BATCH_SIZE, batch_delay=BATCH_DELAY):
+        """
+        Constructor for LeaderboardClient
+        Starts the background thread, which connects to the server and keeps trying until close is called.
+        :param host: the address of the server
+        :param port: the port of the server
+        :param batch_size: the most scores sent in one message
+        :param batch_delay: the seconds to wait for more scores before sending a batch
+        """
+        self.host = host
+        self.port = port
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.pending = deque(maxlen=MAX_PENDING)
+        self.board = None
+        self.connected = False
+        self.closing = False
+        self.lock = threading.Lock()
+        self.loop = asyncio.new_event_loop()
+        self.wakeup = None
+        self.thread = threading.Thread(target=self.run, name="leaderboard-client", daemon=True)
+        self.thread.start()
+
+    def submit(self, initials, score, day=None):
+        """
+        Method queues a score to be sent to the server. Never waits on the network.
+        :param initials: the player's initials
+        :param score: the score
+        :param day: the day the score was set, defaulting to today
+        :return: None
+        """
+        self.pending.append([initials, score, today() if day is None else day])
+        if len(self.pending) >= self.batch_size:
+            self.wake()
+
+    def rank(self, score):
+        """
+        Method works out the rank a score would get on the global board, from this cabinet's copy of it
+        :param score: the score
+        :return: the rank, counting from 1, or None if it wouldn't make the board or the server isn't connected
+        """
+        with self.lock:
+            if not self.connected or self.board is None:
+                return None
+            return self.board.rank(score)
+
+    def top(self, n=10):
+        """
+        Method returns the highest scores on the global board, from this cabinet's copy of it
+        :param n: the number of scores to return
+        :return: a list of (initials, score) tuples, highest first, which is empty before the first connection
+        """
+        with self.lock:
+            return [] if self.board is None else self.board.top(n)
+
+    def close(self, timeout=1.0):
+        """
+        Method stops the background thread, first sending any queued scores if the server is connected
+        :param timeout: the most seconds to wait for the thread to finish
+        :return: None
+        """
+        self.closing = True
+        self.wake()
+        self.thread.join(timeout)
+
+    def wake(self):
+        """
+        Method tells the background thread to send what is queued now rather than waiting for the batch delay
+        :return: None
+        """
+        if self.wakeup is not None and not self.loop.is_closed():
+            try:
+                self.loop.call_soon_threadsafe(self.wakeup.set)
+            except RuntimeError:
+                pass
+
+    def run(self):
+        """
+        Method runs the background thread's event loop
+        :return: None
+        """
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self.main())
+        finally:
+            self.loop.close()
+
+    async def pause(self, seconds):
+        """
+        Method waits for a number of seconds, or until the client is woken up
+        :param seconds: the most seconds to wait
+        :return: None
+        """
+        try:
+            await asyncio.wait_for(self.wakeup.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+        self.wakeup.clear()
+
+    async def main(self):
+        """
+        Method connects to the server, reconnecting whenever the connection is lost, until the client is closed
+        :return: None
+        """
+        self.wakeup = asyncio.Event()
+        while not self.closing:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            except OSError:
+                await self.pause(RECONNECT_DELAY)
+                continue
+            receiving = asyncio.ensure_future(self.receive(reader))
+            sending = asyncio.ensure_future(self.send(writer))
+            await asyncio.wait([receiving, sending], return_when=asyncio.FIRST_COMPLETED)
+            for task in (receiving, sending):
+                task.cancel()
+            self.connected = False
+            writer.close()
+            if not self.closing:
+                await self.pause(RECONNECT_DELAY)
+
+    async def receive(self, reader):
+        """
+        Method applies the board and deltas sent by the server until the connection closes
+        :param reader: the StreamReader of the connection
+        :return: None
+        """
+        while True:
+            try:
+                line = await reader.readline()
+            except ConnectionError:
+                return
+            if not line:
+                return
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            with self.lock:
+                if message.get("type") == "board":
+                    self.board = TopScores(message["capacity"], [tuple(entry) for entry in message["scores"]])
+                    self.connected = True
+                elif message.get("type") == "delta" and self.board is not None:
+                    for initials, score in message["scores"]:
+                        self.board.insert(initials, score)
+
+    async def send(self, writer):
+        """
+        Method sends the queued scores in batches until the connection breaks or the client is closed. A batch that
+        was handed to the connection just before it broke can be lost; the score is still in the cabinet's own file.
+        :param writer: the StreamWriter of the connection
+        :return: None
+        """
+        while True:
+            if not self.closing:
+                await self.pause(self.batch_delay)
+            while len(self.pending) > 0:
+                batch = [self.pending.popleft() for _ in range(min(self.batch_size, len(self.pending)))]
+                writer.write(encode({"type": "submit", "scores": batch}))
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    self.pending.extendleft(reversed(batch))
+                    return
+            if self.closing:
+                return
+
+
+async def main(host, port, capacity, filename):
+    """
+    Method runs a leaderboard server until it is interrupted
+    :param host: the address to listen on
+    :param port: the port to listen on
+    :param capacity: the number of scores on the global board
+    :param filename: the leaderboard file to save every score to, or None to keep the board in memory only
+    :return: None
+    """
+    store = LeaderboardStore(filename, background=True) if filename else None
+    server = await LeaderboardServer(capacity, store).serve(host, port)
+    print("Leaderboard server listening on %s:%d" % (host, server.sockets[0].getsockname()[1]))
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if store is not None:
+            store.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run a leaderboard server for several cabinets")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port to listen on")
+    parser.add_argument("--capacity", type=int, default=CAPACITY, help="number of scores on the global board")
+    parser.add_argument("--file", help="leaderboard file to save every score to")
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args.host, args.port, args.capacity, args.file))
+    except KeyboardInterrupt:
+        pass
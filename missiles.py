@@ -0,0 +1,111 @@
+"""
+Fixed-size pool for the player's missiles.
+
+The missiles in the air are kept in preallocated NumPy arrays instead of a list of tuples. The live missiles are
+always packed into the first count slots, so removing one just moves the last live missile into its slot (a swap
+remove) and nothing has to be shifted or reallocated. Moving every missile is one in-place array operation, and so is
+finding the ones that have left the screen, so firing, moving and removing missiles doesn't allocate anything in a
+normal step no matter how fast the player fires.
+"""
+# Imports
+import numpy as np
+
+
+class MissilePool:
+    """
+    Class to represent the player's missiles as a pool of preallocated arrays
+    Instance variables:
+    capacity - the most missiles that can be in the air at once
+    x, y - float arrays with the coordinates of each missile; only the first count are in use
+    count - the number of missiles in the air
+    gone - a bool array used to mark the missiles that have left the screen
+    """
+    def __init__(self, capacity):
+        """
+        One argument constructor for MissilePool
+        :param capacity: the most missiles that can be in the air at once
+        """
+        self.capacity = capacity
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.gone = np.zeros(capacity, dtype=bool)
+        self.count = 0
+
+    def __len__(self):
+        """
+        Method returns the number of missiles in the air
+        :return: an int
+        """
+        return self.count
+
+    def fire(self, x, y):
+        """
+        Method adds a missile to the pool
+        :param x: the x coordinate of the missile
+        :param y: the y coordinate of the missile
+        :return: True if the missile was fired, False if the pool was full
+        """
+        if self.count == self.capacity:
+            return False
+        self.x[self.count] = x
+        self.y[self.count] = y
+        self.count += 1
+        return True
+
+    def remove(self, index):
+        """
+        Method removes a missile by moving the last missile into its slot. Missiles after index in the pool are not
+        moved, so a loop that removes missiles should go through the pool from the end.
+        :param index: the slot of the missile to remove
+        :return: None
+        """
+        last = self.count - 1
+        self.x[index] = self.x[last]
+        self.y[index] = self.y[last]
+        self.count = last
+
+    def move(self, dy):
+        """
+        Method moves every missile vertically
+        :param dy: the distance to move, negative to go up the screen
+        :return: None
+        """
+        count = self.count
+        np.add(self.y[:count], dy, out=self.y[:count])
+
+    def cull(self):
+        """
+        Method removes the missiles that have gone off the top of the screen
+        :return: None
+        """
+        count = self.count
+        gone = self.gone[:count]
+        np.less(self.y[:count], 0, out=gone)
+        if gone.any():
+            for index in np.flatnonzero(gone)[::-1].tolist():
+                self.remove(index)
+
+    def clear(self):
+        """
+        Method removes every missile
+        :return: None
+        """
+        self.count = 0
+
+    def positions(self):
+        """
+        Method returns the coordinates of the missiles in the air
+        :return: a list of (x, y) tuples
+        """
+        count = self.count
+        return list(zip(self.x[:count].tolist(), self.y[:count].tolist()))
+
+    def set_positions(self, positions):
+        """
+        Method replaces the missiles in the air, for setting up tests and benchmarks
+        :param positions: a list of (x, y) tuples, no longer than the capacity
+        :return: None
+        """
+        self.count = 0
+        for x, y in positions:
+            self.fire(x, y)
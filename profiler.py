@@ -0,0 +1,269 @@
+"""
+Per-frame timing of the game loop.
+
+A FrameProfiler times named phases of each frame. Functions and methods are timed by swapping them for wrapped versions
+with instrument, so the code being timed doesn't need to know about the profiler, and blocks of code in the main loop
+can be timed with the phase context manager. The profiler keeps the last few seconds of frames for the on-screen
+overlay, and can keep every frame so the whole run can be written out as a CSV or JSON trace.
+
+A StartupProfile times the stages of starting the game, up to the first frame and the work done after it.
+"""
+# Imports
+import csv
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Constants
+HISTORY = 300   # Number of recent frames used for the overlay's statistics
+WAIT_PHASE = "wait"     # Name of the phase spent sleeping until the next frame
+OVERLAY_REFRESH = 30    # Number of frames between updates of the overlay's text, so it can be read
+
+
+def percentile(values, fraction):
+    """
+    Method returns a percentile of a list of numbers
+    :param values: a list of numbers
+    :param fraction: the percentile as a fraction, for example 0.99
+    :return: the value below which that fraction of the values fall, or 0 for an empty list
+    """
+    if len(values) == 0:
+        return 0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class FrameProfiler:
+    """
+    Class to represent the timings of the frames of the game loop
+    Instance variables:
+    phases - a list of the names of the phases seen so far, in the order they were first seen
+    current - a dictionary mapping phase names to the seconds spent in them so far this frame
+    history - a deque of the most recent frame records
+    trace - a list of every frame record, or None if the trace isn't being kept
+    overlay - True if the overlay should be drawn
+    frame - the number of frames that have finished
+    lines - the overlay's text as of its last refresh
+    A frame record is a dictionary with the frame number, its start time, its total and work times in milliseconds,
+    the milliseconds spent in each phase, and the entity counts passed to end_frame.
+    """
+    def __init__(self, keep_trace=False, overlay=False):
+        """
+        Constructor for FrameProfiler
+        :param keep_trace: True to keep every frame so it can be exported
+        :param overlay: True to start with the overlay showing
+        """
+        self.phases = []
+        self.current = {}
+        self.history = deque(maxlen=HISTORY)
+        self.trace = [] if keep_trace else None
+        self.overlay = overlay
+        self.frame = 0
+        self.lines = []
+        self.start = None
+        self.first_start = None
+
+    def add_time(self, name, seconds):
+        """
+        Method adds time to a phase of the current frame
+        :param name: the name of the phase
+        :param seconds: the time to add in seconds
+        :return: None
+        """
+        if name not in self.current:
+            self.current[name] = seconds
+            if name not in self.phases:
+                self.phases.append(name)
+        else:
+            self.current[name] += seconds
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Method times the block of code in a with statement as a phase
+        :param name: the name of the phase
+        :return: a context manager
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def wrap(self, name, function):
+        """
+        Method returns a version of a function that adds the time spent in it to a phase
+        :param name: the name of the phase
+        :param function: the function to time
+        :return: the timed function
+        """
+        perf_counter = time.perf_counter
+        add_time = self.add_time
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                add_time(name, perf_counter() - start)
+        timed.__wrapped__ = function
+        return timed
+
+    def instrument(self, owner, names, phase=None):
+        """
+        Method replaces functions or methods with timed versions
+        :param owner: an object whose methods should be timed, or a dictionary such as a module's globals()
+        :param names: a list of the names of the functions to time
+        :param phase: the phase to add the time to, or None to use each function's name
+        :return: None
+        """
+        for name in names:
+            if isinstance(owner, dict):
+                owner[name] = self.wrap(phase or name, owner[name])
+            else:
+                setattr(owner, name, self.wrap(phase or name, getattr(owner, name)))
+
+    def begin_frame(self):
+        """
+        Method starts timing a new frame
+        :return: None
+        """
+        self.start = time.perf_counter()
+        if self.first_start is None:
+            self.first_start = self.start
+        self.current = {}
+
+    def end_frame(self, counts=None):
+        """
+        Method finishes timing the current frame and records it
+        :param counts: a dictionary of entity counts to record with the frame, such as the number of enemies
+        :return: None
+        """
+        if self.start is None:
+            return
+        total = time.perf_counter() - self.start
+        record = {"frame": self.frame, "time": round(self.start - self.first_start, 6),
+                  "total_ms": total * 1000, "work_ms": (total - self.current.get(WAIT_PHASE, 0)) * 1000}
+        for name, seconds in self.current.items():
+            record[name] = seconds * 1000
+        if counts:
+            record.update(counts)
+        self.history.append(record)
+        if self.trace is not None:
+            self.trace.append(record)
+        self.frame += 1
+        self.start = None
+
+    def stats(self):
+        """
+        Method sums up the recent frames
+        :return: a dictionary with the frames per second, the 50th and 99th percentile frame and work times in
+        milliseconds, the average milliseconds spent in each phase, and the entity counts of the latest frame
+        """
+        frames = list(self.history)
+        if len(frames) == 0:
+            return {"fps": 0, "frame_p50": 0, "frame_p99": 0, "work_p50": 0, "work_p99": 0, "phases": {}, "counts": {}}
+        totals = [frame["total_ms"] for frame in frames]
+        work = [frame["work_ms"] for frame in frames]
+        phases = {name: sum(frame.get(name, 0) for frame in frames) / len(frames) for name in self.phases}
+        counts = {key: value for key, value in frames[-1].items()
+                  if key not in self.phases and key not in ("frame", "time", "total_ms", "work_ms")}
+        return {"fps": 1000 * len(frames) / max(sum(totals), 1e-9),
+                "frame_p50": percentile(totals, 0.5), "frame_p99": percentile(totals, 0.99),
+                "work_p50": percentile(work, 0.5), "work_p99": percentile(work, 0.99),
+                "phases": phases, "counts": counts}
+
+    def summary_lines(self):
+        """
+        Method describes the recent frames as a few lines of text for the overlay
+        :return: a list of strings
+        """
+        stats = self.stats()
+        lines = ["FPS %.1f  frame p50 %.1f ms  p99 %.1f ms" % (stats["fps"], stats["frame_p50"], stats["frame_p99"]),
+                 "work p50 %.2f ms  p99 %.2f ms" % (stats["work_p50"], stats["work_p99"])]
+        if stats["counts"]:
+            lines.append("  ".join("%s %s" % (key, value) for key, value in stats["counts"].items()))
+        for name, ms in stats["phases"].items():
+            if name != WAIT_PHASE:
+                lines.append("%s %.3f ms" % (name, ms))
+        return lines
+
+    def overlay_lines(self):
+        """
+        Method returns the overlay's text, refreshing it every OVERLAY_REFRESH frames so it changes slowly enough to
+        read and the rendered lines can be cached
+        :return: a list of strings
+        """
+        if len(self.lines) == 0 or self.frame % OVERLAY_REFRESH == 0:
+            self.lines = self.summary_lines()
+        return self.lines
+
+    def export(self, filename):
+        """
+        Method writes every recorded frame to a file, as JSON if the name ends in .json and as CSV otherwise
+        :param filename: the name of the file to write
+        :return: None
+        """
+        frames = self.trace if self.trace is not None else list(self.history)
+        if filename.endswith(".json"):
+            with open(filename, "w") as f:
+                json.dump({"phases": self.phases, "frames": frames}, f)
+            return
+        columns = ["frame", "time", "total_ms", "work_ms"] + list(self.phases)
+        for frame in frames:
+            for key in frame:
+                if key not in columns:
+                    columns.append(key)
+        with open(filename, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=columns, restval=0)
+            writer.writeheader()
+            writer.writerows(frames)
+
+
+class StartupProfile:
+    """
+    Class to represent how long each stage of starting the game took
+    Instance variables:
+    start - the perf_counter time the game started loading
+    last - the perf_counter time the last stage finished
+    stages - a list of (name, seconds) tuples, in the order the stages finished
+    first_frame - the seconds from the start to the first frame being shown, or None until it is
+    """
+    def __init__(self, start=None):
+        """
+        Constructor for StartupProfile
+        :param start: the perf_counter time the game started loading, defaulting to now
+        """
+        self.start = time.perf_counter() if start is None else start
+        self.last = self.start
+        self.stages = []
+        self.first_frame = None
+
+    def mark(self, name):
+        """
+        Method records that a stage has finished
+        :param name: the name of the stage
+        :return: None
+        """
+        now = time.perf_counter()
+        self.stages.append((name, now - self.last))
+        self.last = now
+
+    def shown(self):
+        """
+        Method records that the first frame is on the display
+        :return: None
+        """
+        self.first_frame = time.perf_counter() - self.start
+
+    def report_lines(self):
+        """
+        Method describes the stages as lines of text
+        :return: a list of strings
+        """
+        lines = ["%-16s %8.1f ms" % (name, seconds * 1000) for name, seconds in self.stages]
+        if self.first_frame is not None:
+            lines.append("%-16s %8.1f ms" % ("first frame", self.first_frame * 1000))
+        lines.append("%-16s %8.1f ms" % ("total", (self.last - self.start) * 1000))
+        return lines
@@ -0,0 +1,145 @@
+"""
+Renderers that put finished frames on the display.
+
+Renderer redraws the whole window and updates all of it every frame. DirtyRectRenderer is for machines where pushing a
+full window to the display is too slow: it only erases and updates the parts of the window where something was drawn
+this frame or the last one, and it doesn't update the display at all while a menu screen that hasn't changed is shown.
+
+Either renderer can be given a ScaledDisplay (see layout.py) for a resizable window. Frames are then drawn onto the
+ScaledDisplay's frame and stretched into the window when they are shown, and the whole window is always updated since
+the stretched frame covers all of it.
+"""
+# Imports
+import pygame
+
+
+class Renderer:
+    """
+    Class to represent a renderer that updates the whole display every frame
+    Instance variables:
+    background - the Background drawn behind the game
+    display - the ScaledDisplay frames are stretched into, or None to draw straight onto the window
+    """
+    def __init__(self, background, display=None):
+        """
+        Constructor for Renderer
+        :param background: the Background drawn behind the game
+        :param display: the ScaledDisplay frames are stretched into, or None to draw straight onto the window
+        """
+        self.background = background
+        self.display = display
+
+    def present_static(self, surface, key, draw):
+        """
+        Method draws a menu screen and shows it
+        :param surface: the display surface
+        :param key: a tuple that changes whenever the screen's content changes
+        :param draw: a function that takes the surface and draws the whole screen on it
+        :return: True if the display was updated, False otherwise
+        """
+        draw(surface)
+        self.update()
+        return True
+
+    def present_frame(self, surface, draw_sprites):
+        """
+        Method draws a frame of the game and shows it
+        :param surface: the display surface
+        :param draw_sprites: a function that takes the surface, draws everything that goes on top of the background and
+        returns a list of Rects covering what it drew
+        :return: None
+        """
+        self.background.draw(surface)
+        draw_sprites(surface)
+        self.update()
+
+    def update(self, rects=None):
+        """
+        Method pushes what has been drawn to the display
+        :param rects: a list of the Rects to update, or None to update the whole display
+        :return: None
+        """
+        if self.display is not None:
+            self.display.present()
+            pygame.display.update()
+        elif rects is None:
+            pygame.display.update()
+        else:
+            pygame.display.update(rects)
+
+    def invalidate(self):
+        """
+        Method forgets what is on the display, so the next frame is drawn and shown in full
+        :return: None
+        """
+        pass
+
+
+class DirtyRectRenderer(Renderer):
+    """
+    Class to represent a renderer that only updates the parts of the display that changed
+    Instance variables:
+    background - the Background drawn behind the game
+    display - the ScaledDisplay frames are stretched into, or None to draw straight onto the window
+    previous - a list of the Rects drawn last frame, or None if the whole window has to be redrawn
+    static_key - the key of the menu screen on the display, or None if the game is being shown
+    skipped - the number of frames where nothing had changed so the display wasn't updated
+    """
+    def __init__(self, background, display=None):
+        """
+        Constructor for DirtyRectRenderer
+        :param background: the Background drawn behind the game
+        :param display: the ScaledDisplay frames are stretched into, or None to draw straight onto the window
+        """
+        super().__init__(background, display)
+        self.previous = None
+        self.static_key = None
+        self.skipped = 0
+
+    def present_static(self, surface, key, draw):
+        """
+        Method draws a menu screen and shows it, unless the same screen is already on the display. Animated
+        backgrounds are always redrawn.
+        :param surface: the display surface
+        :param key: a tuple that changes whenever the screen's content changes
+        :param draw: a function that takes the surface and draws the whole screen on it
+        :return: True if the display was updated, False otherwise
+        """
+        if key == self.static_key and not self.background.is_animated():
+            self.skipped += 1
+            return False
+        draw(surface)
+        self.update()
+        self.static_key = key
+        self.previous = None
+        return True
+
+    def present_frame(self, surface, draw_sprites):
+        """
+        Method erases last frame's sprites, draws this frame's, and updates only the Rects that were touched
+        :param surface: the display surface
+        :param draw_sprites: a function that takes the surface, draws everything that goes on top of the background and
+        returns a list of Rects covering what it drew
+        :return: None
+        """
+        self.static_key = None
+        # Everything has to be redrawn after a menu screen or when the background moves
+        redraw = self.previous is None or self.background.is_animated()
+        if redraw:
+            self.background.draw(surface)
+        else:
+            for rect in self.previous:
+                self.background.restore(surface, rect)
+        bounds = surface.get_rect()
+        rects = [rect.clip(bounds) for rect in draw_sprites(surface)]
+        rects = [rect for rect in rects if rect.width > 0 and rect.height > 0]
+        self.update(None if redraw else self.previous + rects)
+        self.previous = rects
+
+    def invalidate(self):
+        """
+        Method forgets what is on the display, so the next frame is drawn and shown in full
+        :return: None
+        """
+        self.previous = None
+        self.static_key = None
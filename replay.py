@@ -0,0 +1,187 @@
+"""
+Recording and replaying games.
+
+A game is decided entirely by its seed and the inputs of each step, so a recording only has to store those. The inputs
+are packed into one byte per step and runs of identical steps are stored as a single (byte, count) pair, which keeps a
+long game down to a few kilobytes. The recording ends with a hash of the final game state, so a replay can check that
+it ended up exactly where the recorded game did.
+
+Replay a recording as fast as possible and check it with:
+    python replay.py game.rec
+"""
+# Imports
+import argparse
+import struct
+import time
+from simulation import GameSimulation, Inputs
+
+# Constants
+MAGIC = b"GREC"     # First bytes of every recording
+VERSION = 4     # Version of the file format, raised whenever the same inputs would play out differently
+HEADER = struct.Struct("<4sBQHHI")  # magic, version, seed, width, height, number of steps
+RUN = struct.Struct("<BH")  # packed inputs, number of steps in a row with those inputs
+MAX_RUN = 0xFFFF    # Longest run that fits in one RUN
+HASH_SIZE = 8   # Length of the state hash at the end of the file
+MAX_SEED = 2 ** 64 - 1  # Largest seed that fits in the header
+
+
+def parse_seed(text):
+    """
+    Method parses a seed given on the command line, checking that it fits in the header of a recording
+    :param text: a string such as "12345"
+    :return: an int from 0 to MAX_SEED
+    """
+    try:
+        seed = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected a whole number, got %r" % text)
+    if not 0 <= seed <= MAX_SEED:
+        raise argparse.ArgumentTypeError("expected a seed from 0 to %d, got %d" % (MAX_SEED, seed))
+    return seed
+
+
+def pack_inputs(inputs):
+    """
+    Method packs the inputs of a step into one byte
+    :param inputs: an Inputs tuple
+    :return: an int from 0 to 255
+    """
+    return (inputs.move + 1) | (inputs.fire << 2)
+
+
+def unpack_inputs(byte):
+    """
+    Method turns a byte from pack_inputs back into the inputs of a step
+    :param byte: an int from 0 to 255
+    :return: an Inputs tuple
+    """
+    return Inputs((byte & 3) - 1, bool(byte & 4))
+
+
+class InputRecorder:
+    """
+    Class to represent a recording of a game in progress. Set it as a GameSimulation's recorder and it is handed the
+    inputs of every step.
+    Instance variables:
+    seed, width, height - the settings the game was created with
+    runs - a list of [packed inputs, count] lists
+    steps - the number of steps recorded
+    """
+    def __init__(self, game):
+        """
+        One argument constructor for InputRecorder
+        Starts recording the game provided. The game should not have been stepped yet.
+        :param game: the GameSimulation to record
+        """
+        self.seed = game.seed
+        self.width = game.width
+        self.height = game.height
+        self.runs = []
+        self.steps = 0
+        game.recorder = self
+
+    def record(self, inputs):
+        """
+        Method adds the inputs of one step to the recording
+        :param inputs: an Inputs tuple
+        :return: None
+        """
+        byte = pack_inputs(inputs)
+        runs = self.runs
+        if len(runs) > 0 and runs[-1][0] == byte and runs[-1][1] < MAX_RUN:
+            runs[-1][1] += 1
+        else:
+            runs.append([byte, 1])
+        self.steps += 1
+
+    def to_bytes(self, game):
+        """
+        Method packs the recording into the bytes of a recording file
+        :param game: the GameSimulation that was recorded, whose state hash ends the file
+        :return: a bytes object
+        """
+        parts = [HEADER.pack(MAGIC, VERSION, self.seed, int(self.width), int(self.height), self.steps)]
+        parts.extend(RUN.pack(byte, count) for byte, count in self.runs)
+        parts.append(game.state_hash())
+        return b"".join(parts)
+
+    def save(self, filename, game):
+        """
+        Method writes the recording to a file
+        :param filename: the name of the file to write
+        :param game: the GameSimulation that was recorded
+        :return: None
+        """
+        with open(filename, "wb") as f:
+            f.write(self.to_bytes(game))
+
+
+class Recording:
+    """
+    Class to represent a recording read back from a file
+    Instance variables:
+    seed, width, height - the settings the recorded game was created with
+    steps - the number of steps recorded
+    runs - a list of (packed inputs, count) tuples
+    final_hash - the state hash of the recorded game when the recording ended
+    """
+    def __init__(self, data):
+        """
+        One argument constructor for Recording
+        :param data: the bytes of a recording file
+        """
+        magic, version, self.seed, self.width, self.height, self.steps = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a version %d recording" % VERSION)
+        body = data[HEADER.size:len(data) - HASH_SIZE]
+        self.runs = list(RUN.iter_unpack(body))
+        self.final_hash = data[len(data) - HASH_SIZE:]
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Method reads a recording from a file
+        :param filename: the name of the file to read
+        :return: a Recording
+        """
+        with open(filename, "rb") as f:
+            return cls(f.read())
+
+    def inputs(self):
+        """
+        Method goes through the inputs of every recorded step in order
+        :return: a generator of Inputs tuples
+        """
+        for byte, count in self.runs:
+            inputs = unpack_inputs(byte)
+            for _ in range(count):
+                yield inputs
+
+    def replay(self):
+        """
+        Method plays the recorded game again from the start as fast as possible
+        :return: a tuple of the GameSimulation at the end of the replay and True if its state matches the recording
+        """
+        game = GameSimulation(self.width, self.height, self.seed)
+        step = game.step
+        for byte, count in self.runs:
+            inputs = unpack_inputs(byte)
+            for _ in range(count):
+                step(inputs)
+        return game, game.state_hash() == self.final_hash
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Replay a recorded game and check it ends the same way")
+    parser.add_argument("recording", help="the recording file to replay")
+    args = parser.parse_args()
+
+    recording = Recording.load(args.recording)
+    start = time.perf_counter()
+    game, matched = recording.replay()
+    seconds = time.perf_counter() - start
+    print("Replayed %d steps in %.2f s (%.0f steps/s)"
+          % (recording.steps, seconds, recording.steps / max(seconds, 1e-9)))
+    print("Score %d, level %d" % (game.score, game.level))
+    print("State hash %s" % ("matches" if matched else "DOES NOT MATCH"))
+    raise SystemExit(0 if matched else 1)
@@ -0,0 +1,485 @@
+"""
+Headless simulation core for Galaga.
+
+The game logic lives here with no dependency on pygame, so a game can be stepped without a display and as fast as the
+CPU allows. A GameSimulation is advanced one fixed timestep at a time with step(inputs), or by an amount of real time
+with advance(elapsed, inputs), which runs as many fixed steps as fit using an accumulator. Drawing is left to whatever
+consumes the simulation (see galaga.py).
+"""
+# Imports
+import hashlib
+import random
+import struct
+from collections import namedtuple
+import numpy as np
+from collision import Collision, SHIP_HITS_PLAYER, player_hit_circle, ships_hitting_player
+from fleet import Fleet, DIVING, FLEET_SWAY_SPEED
+from missiles import MissilePool
+from spatial import SpatialHash
+
+# Constants
+FRAME_RATE = 60    # Number of simulation steps per second of game time
+TIME_STEP = 1 / FRAME_RATE  # Length of one simulation step in seconds
+MAX_FRAME_TIME = 0.25   # Most real time one call to advance will simulate, so a stall can't spiral
+DEFAULT_WIDTH = 518     # Width used when no window is available
+DEFAULT_HEIGHT = 648    # Height used when no window is available
+PLAYER_SPEED = 5    # Horizontal speed of the player while an arrow key is held
+MISSILE_SPEED = 7   # Distance a missile travels up the screen each step
+EXPLOSION_FRAMES = 50   # Number of steps the player's explosion is shown for
+STARTING_LIVES = 3  # Number of lives the player starts with
+GRID_FLEET_RATIO = 10   # The grid is used when missiles times this is at least the fleet size (see benchmark.py)
+GRID_CELL_SIZE = 32     # Size of the cells used to look up which enemies a missile might hit (at least a ship's width)
+
+# Inputs is the state of the controls for a single step.
+# move - -1 to move left, 1 to move right, 0 to stand still
+# fire - True if the fire button was pressed since the last step
+Inputs = namedtuple("Inputs", ["move", "fire"])
+NO_INPUT = Inputs(0, False)
+
+# Difficulty is the set of numbers that decide how hard the game is (see tuning.py).
+# drop_rate - chance out of 500, for each level, that a ship dives at the player each step
+# sway_speed - how far the formation sways each step
+# sway_steps - number of steps the formation sways one way before turning back
+# row_min - fewest ships in the first row of a fleet; each row after it has one fewer
+# row_growth - how many more ships a row can have for each level
+Difficulty = namedtuple("Difficulty", ["drop_rate", "sway_speed", "sway_steps", "row_min", "row_growth"])
+DEFAULT_DIFFICULTY = Difficulty(2, FLEET_SWAY_SPEED, 150, 10, 3)
+
+
+class PlayerShip:
+    """
+    Class to represent the player's ship
+    Instance variables:
+    lives - an int representing the number of lives remaining
+    position - a list of three tuples (coordinates) where the triangular ship will go
+    speed - an int representing the speed the ship is moving at
+    missiles - the MissilePool of missiles the ship has shot
+    min_x, max_x - the farthest left and right the tip of the ship can go
+    leftmost, rightmost - the positions of the ship at the left and right edges, worked out once
+    """
+    def __init__(self, width, height):
+        """
+        Two argument constructor for PlayerShip
+        Initializes lives to 3, the position to be in the middle of the screen close to the bottom, and the speed to 0
+        The missiles will be a pool holding the coordinates of the missiles that the ship has shot. It has room for one
+        missile fired every step for as long as a missile takes to leave the screen, so it can never run out.
+        Explosion will be a counter that keeps track of if an explosion should be shown.
+        :param width: the width of the playing field
+        :param height: the height of the playing field
+        """
+        self.width = width
+        self.height = height
+        self.lives = STARTING_LIVES
+        self.shipHits = [] # List of the ships that have hit the player so that collisions aren't counted twice
+        self.position = [(width*0.5, height*0.85), (width*0.47, height*0.9), (width*0.53, height*0.9)]
+        self.speed = 0
+        self.missiles = MissilePool(int(height // MISSILE_SPEED) + 2)
+        self.explosion = 0
+        self.min_x = width*0.05
+        self.max_x = width*0.95
+        self.leftmost = ((width*0.05, height*0.85), (width*0.02, height*0.9), (width*0.08, height*0.9))
+        self.rightmost = ((width * 0.95, height * 0.85), (width * 0.92, height * 0.9), (width * 0.98, height * 0.9))
+
+    def get_position(self):
+        """
+        Method returns a list of the coordinates that make up the ship
+        :return: a list of tuples containing the coordinates of each vertex of the ship
+        """
+        return self.position
+
+    def move_speed(self):
+        """
+        Moves the player across the screen according to their speed
+        :return: None
+        """
+        for i in range(len(self.position)):
+            self.position[i] = (self.position[i][0] + self.speed, self.position[i][1])
+
+    def set_speed(self, speed):
+        """
+        Sets the player's speed to the speed entered as the argument
+        :param speed: an int representing the player's speed
+        :return: None
+        """
+        self.speed = speed
+
+    def keep_in_bounds(self):
+        """
+        Keeps the player's coordinates from moving outside of the viewable window
+        :return: None
+        """
+        # If it's too far left, move it to the farthest left allowed
+        if self.position[0][0] < self.min_x:
+            self.position = list(self.leftmost)
+        # If it's too far right, move it to the farthest right allowed
+        elif self.position[0][0] > self.max_x:
+            self.position = list(self.rightmost)
+
+    def shoot(self):
+        """
+        Method shoots a missile from the tip of the ship
+        :return: None
+        """
+        self.missiles.fire(*self.position[0])
+
+    def get_missiles(self):
+        """
+        Returns the pool of missiles
+        :return: the MissilePool
+        """
+        return self.missiles
+
+    def move_missiles(self):
+        """
+        Method moves the missiles up the screen
+        :return: None
+        """
+        self.missiles.move(-MISSILE_SPEED)
+
+    def remove_missiles(self):
+        """
+        Method removes missiles from the pool if they have left the screen.
+        :return: None
+        """
+        self.missiles.cull()
+
+    def explode_missile(self, index):
+        """
+        Method used to remove a missile when it hits a ship
+        :param index: the slot in the missile pool of the missile to be removed
+        :return: None
+        """
+        self.missiles.remove(index)
+
+    def dec_lives(self, ship):
+        """
+        Method decrements the number of lives by 1
+        :param ship: something that identifies the enemy ship that hit the player
+        :return: None
+        """
+        if ship not in self.shipHits:
+            self.shipHits.append(ship)
+        self.lives = STARTING_LIVES - len(self.shipHits)
+
+    def get_lives(self):
+        """
+        Method returns the number of lives the player has
+        :return: an int representing the number of lives remaining
+        """
+        return self.lives
+
+    def explode(self):
+        """
+        Method sets the explosion counter to a positive number so an explosion is shown instead of the ship
+        :return: None
+        """
+        self.explosion = EXPLOSION_FRAMES
+        self.speed = 0
+
+    def update_explosion(self):
+        """
+        Method counts down the explosion so the ship comes back once it has been shown for long enough
+        :return: None
+        """
+        if self.explosion > 0:
+            self.explosion -= 1
+
+    def get_explosion(self):
+        """
+        Method returns the explosion count of the player to see if they are currently exploding
+        :return: int explosion count of the ship
+        """
+        return self.explosion
+
+
+class GameSimulation:
+    """
+    Class to represent one game of Galaga, independent of how (or whether) it is drawn
+    Instance variables:
+    width, height - the size of the playing field
+    player - the PlayerShip
+    fleet - the Fleet of enemy ships
+    enemy_grid - a SpatialHash of the enemy ships, rebuilt on steps with enough missiles to look up hits with it
+    sway_direction - bool used to tell if the fleet is swaying left or right
+    moves - counter to keep track of if it's time for the ships to change direction
+    score - the player's score
+    level - the level the player is on
+    completed_level - True while the player is in between levels
+    lost - True once the player has run out of lives
+    frame - the number of steps that have been simulated
+    seed - the seed of the game's random number generator
+    rng - the random.Random every random choice in the game is made with, so a seed and the inputs decide the game
+    recorder - an object whose record method is called with the inputs of every step, or None
+    events - a list of the Collision events found this step that haven't been applied yet
+    difficulty - the Difficulty the game is played at
+    """
+    def __init__(self, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT, seed=None, difficulty=DEFAULT_DIFFICULTY):
+        """
+        Constructor for GameSimulation
+        Creates the player and the first level's fleet.
+        :param width: the width of the playing field
+        :param height: the height of the playing field
+        :param seed: an int to seed the game's random number generator with, or None to pick one at random
+        :param difficulty: the Difficulty to play at
+        """
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(63)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.difficulty = difficulty
+        self.recorder = None
+        self.width = width
+        self.height = height
+        self.player = PlayerShip(width, height)
+        self.fleet = Fleet(difficulty.sway_speed)
+        self.sway_direction = True
+        self.moves = difficulty.sway_steps // 2
+        self.score = 0
+        self.level = 1
+        self.completed_level = False
+        self.lost = False
+        self.frame = 0
+        self.accumulator = 0.0
+        self.enemy_grid = SpatialHash(GRID_CELL_SIZE)
+        self.events = []
+        self.start_level()
+
+    def start_level(self):
+        """
+        Method will generate a fleet of enemies for the level. The method is also used when a player dies to reset the
+        remaining enemies to their orignial position.
+        :return: None
+        """
+        # If there are remaining enemy ships (player lost a life and ships need to be reset), put the ships back
+        if len(self.fleet) > 0:
+            self.fleet.reset_formation(self.sway_direction)
+        else:
+            nums = []
+            row_min = self.difficulty.row_min
+            for i in range(5):
+                num = self.rng.randint(row_min - i, (row_min + self.difficulty.row_growth * self.level) - i)
+                nums.append(num)
+            self.fleet.generate(nums, self.width, 10, self.sway_direction)
+
+    def drop_enemies(self, prob):
+        """
+        Method causes enemies to drop out of the sky at a speed relative to the argument provided
+        :param prob: the higher this number the faster the enemies fall
+        :return: None
+        """
+        if len(self.fleet) > 0:
+            num = self.rng.random() * 500
+            if num < prob:
+                alive = self.fleet.alive_indices()
+                self.drop_enemy(alive[self.rng.randrange(len(alive))])
+
+    def drop_enemy(self, index):
+        """
+        Method makes an enemy ship dive through the middle of the player's hit circle
+        :param index: the index of the ship in the fleet
+        :return: None
+        """
+        center_x, center_y, _ = player_hit_circle(self.player.get_position(), self.fleet.get_width())
+        self.fleet.drop(index, (center_x, center_y), self.width, self.height)
+
+    def move_enemies(self):
+        """
+        Method moves the enemy ships according to their speed
+        :return: None
+        """
+        # Increment the counter to see if the ships need to sway back
+        self.moves += 1
+        center_x, center_y, _ = player_hit_circle(self.player.get_position(), self.fleet.get_width())
+        self.fleet.update((center_x, center_y), self.height, self.sway_direction)
+        # If it's time to switch the direction of the sway
+        if self.moves > self.difficulty.sway_steps:
+            self.sway_direction = not self.sway_direction
+            self.moves = 0
+
+    def destroy_enemy(self, index):
+        """
+        Method removes an enemy ship from the game
+        :param index: the index of the ship in the fleet
+        :return: None
+        """
+        self.fleet.destroy(index)
+
+    def check_missile_collisions(self, use_grid=None):
+        """
+        Method checks if a missile has collided with an enemy and removes the missile and enemy if there is a collision.
+        With enough missiles in the air the enemies are put into a grid first so each missile only has to be checked
+        against the enemies near it. Otherwise each missile is checked against the whole fleet at once with NumPy, which
+        is cheaper than rebuilding the grid when there are few missiles for the size of the fleet.
+        :param use_grid: True to always use the grid, False to check every missile against the whole fleet, None to
+        choose based on the number of missiles and ships
+        :return: None
+        """
+        missiles = self.player.get_missiles()
+        count = len(missiles)
+        if count == 0:
+            return
+        if use_grid is None:
+            use_grid = count * GRID_FLEET_RATIO >= len(self.fleet)
+        fleet = self.fleet
+        width = fleet.get_width()
+        # Go through the missiles from the end of the pool, since removing a missile moves the last one into its slot
+        mxs = missiles.x[:count].tolist()
+        mys = missiles.y[:count].tolist()
+        if use_grid:
+            grid = self.enemy_grid
+            alive = fleet.alive_indices()
+            grid.rebuild(alive.tolist(), fleet.x[alive].tolist(), fleet.y[alive].tolist())
+            xs = fleet.x.tolist()
+            ys = fleet.y.tolist()
+            for i in range(count - 1, -1, -1):
+                mx = mxs[i]
+                my = mys[i]
+                for index in grid.query_point(mx, my):
+                    if xs[index] < mx < xs[index] + width and ys[index] < my < ys[index] + width:
+                        self.score += fleet.get_value(index)
+                        self.destroy_enemy(index)
+                        grid.remove(index, xs[index], ys[index])
+                        self.player.explode_missile(i)
+                        break
+        else:
+            alive = fleet.alive_mask()
+            for i in range(count - 1, -1, -1):
+                mx = mxs[i]
+                my = mys[i]
+                hits = np.flatnonzero(alive & (fleet.x < mx) & (mx < fleet.x + width) &
+                                      (fleet.y < my) & (my < fleet.y + width))
+                if len(hits) > 0:
+                    index = int(hits[0])
+                    alive[index] = False
+                    self.score += fleet.get_value(index)
+                    self.destroy_enemy(index)
+                    self.player.explode_missile(i)
+
+    def check_ship_collisions(self):
+        """
+        Method checks if an enemy ship has collided with the player ship. If there is a collision, it will remove the enemy
+        ship, decrement the player's lives, and reset the enemy ships to be back with the rest of the fleet.
+        :return: None
+        """
+        dropping = self.fleet.indices(DIVING)
+        if len(dropping) == 0:
+            return
+        for index in ships_hitting_player(self.fleet, dropping, self.player.get_position()):
+            self.events.append(Collision(SHIP_HITS_PLAYER, index))
+        self.apply_collisions()
+
+    def apply_collisions(self):
+        """
+        Method applies the queued Collision events in the order they were found. An event is skipped if an earlier one
+        has already changed the ship involved, such as a crash putting the fleet back in formation.
+        :return: None
+        """
+        fleet = self.fleet
+        for event in self.events:
+            if event.kind == SHIP_HITS_PLAYER and fleet.get_state(event.index) == DIVING:
+                self.destroy_enemy(event.index)
+                self.player.dec_lives((self.level, event.index))
+                self.player.explode()
+                # Put the rest of the fleet back in formation
+                if len(fleet) > 0:
+                    self.start_level()
+        self.events.clear()
+
+    def handle_inputs(self, inputs):
+        """
+        Method applies the controls for one step to the game
+        :param inputs: an Inputs tuple
+        :return: None
+        """
+        if self.completed_level:
+            # Firing on the in between levels screen starts the next level
+            if inputs.fire:
+                self.level += 1
+                self.completed_level = False
+                self.start_level()
+        elif self.player.get_explosion() == 0:
+            self.player.set_speed(inputs.move * PLAYER_SPEED)
+            if inputs.fire:
+                self.player.shoot()
+
+    def step(self, inputs=NO_INPUT):
+        """
+        Method advances the game by exactly one fixed timestep
+        :param inputs: an Inputs tuple with the state of the controls for this step
+        :return: None
+        """
+        if self.recorder is not None:
+            self.recorder.record(inputs)
+        self.frame += 1
+        if self.lost:
+            return
+        self.handle_inputs(inputs)
+        if self.completed_level:
+            return
+        # Move the coordinates of the player and missiles
+        self.player.update_explosion()
+        self.player.move_speed()
+        self.player.move_missiles()
+        self.player.remove_missiles()
+        # Keep the player in the viewable frame
+        self.player.keep_in_bounds()
+
+        # Move the enemy ships
+        self.drop_enemies(self.difficulty.drop_rate * self.level)
+        self.move_enemies()
+
+        # Check for collisions between the missiles and enemies
+        self.check_missile_collisions()
+        self.check_ship_collisions()
+
+        # If all ships have been eliminated, the player is in between levels
+        if len(self.fleet) == 0:
+            self.completed_level = True
+        if self.player.get_lives() < 0:
+            self.lost = True
+
+    def advance(self, elapsed, inputs=NO_INPUT):
+        """
+        Method advances the game by an amount of real time, running as many fixed timesteps as fit. Time that doesn't
+        make up a whole step is carried over to the next call.
+        :param elapsed: the number of seconds that have passed since the last call
+        :param inputs: an Inputs tuple; a press of fire is only applied to the first step that is run
+        :return: the number of steps that were run
+        """
+        self.accumulator = min(self.accumulator + elapsed, MAX_FRAME_TIME)
+        steps = 0
+        while self.accumulator >= TIME_STEP:
+            self.step(inputs)
+            inputs = inputs._replace(fire=False)
+            self.accumulator -= TIME_STEP
+            steps += 1
+        return steps
+
+    def state_hash(self):
+        """
+        Method returns a short hash of everything that makes up the state of the game, so two runs can be checked to
+        have ended up in exactly the same place
+        :return: a bytes object 8 bytes long
+        """
+        player = self.player
+        fleet = self.fleet
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update(struct.pack("<qqqq??dq", self.frame, self.score, self.level, self.moves, self.sway_direction,
+                                  self.lost, fleet.offset, player.explosion))
+        digest.update(struct.pack("<q", player.lives))
+        digest.update(np.array(player.position, dtype=float).tobytes())
+        count = len(player.missiles)
+        digest.update(np.column_stack((player.missiles.x[:count], player.missiles.y[:count])).tobytes())
+        for array in (fleet.x, fleet.y, fleet.xspeed, fleet.yspeed, fleet.state, fleet.path, fleet.progress):
+            digest.update(array.tobytes())
+        return digest.digest()
+
+    def run(self, frames, inputs=NO_INPUT):
+        """
+        Method steps the game a number of times as fast as possible, for soak tests and training
+        :param frames: the number of steps to run
+        :param inputs: an Inputs tuple, or a function that takes the simulation and returns one each step
+        :return: None
+        """
+        for _ in range(frames):
+            self.step(inputs(self) if callable(inputs) else inputs)
@@ -0,0 +1,181 @@
+"""
+Snapshots of the whole state of a game.
+
+A snapshot packs everything that decides how a GameSimulation carries on into a compact binary blob: the game's own
+counters, its random number generator, the player (including the missile pool and the ships that have already hit it)
+and every array of the fleet, including the diving ships' curves. Numbers are packed with struct and arrays are copied
+out as raw little-endian bytes, so no objects are pickled and a snapshot can't run code when it is loaded. The blob ends
+with a CRC32 of everything before it, so a snapshot cut short by a power loss is refused rather than half loaded.
+
+Loading a snapshot into an existing game reuses its objects and only copies the numbers and arrays, which is what a bot
+search that keeps branching from the same state wants:
+    state = save_snapshot(game)
+    ... play ahead ...
+    load_snapshot(state, game)
+"""
+# Imports
+import os
+import struct
+import tempfile
+import zlib
+import numpy as np
+from fleet import TRANSITIONS
+from simulation import Difficulty, GameSimulation
+
+# Constants
+MAGIC = b"GSNP"     # First bytes of every snapshot
+VERSION = 2     # Version of the snapshot format, raised whenever what is saved changes
+HEADER = struct.Struct("<4sB")  # magic, version
+# seed (unsigned, as in a recording), width, height, the Difficulty, sway direction, moves, score, level, completed
+# level, lost, frame, accumulator
+GAME = struct.Struct("<Qddddqqq?qqq??qd")
+# lives, speed, explosion, the three vertices of the ship, number of ships that have hit it, number of missiles
+PLAYER = struct.Struct("<qdq6dII")
+FLEET = struct.Struct("<qddI")  # ship width, formation offset, sway speed, number of ships
+RANDOM = struct.Struct("<B?d")  # version of the generator's state, whether a gauss value is waiting, the gauss value
+RANDOM_WORDS = struct.Struct("<625I")   # The 32 bit words of the state of random.Random
+CRC = struct.Struct("<I")   # Checksum at the end of a snapshot
+# Name, saved dtype, and shape of one ship's entry of each fleet array, in the order they are saved
+FLEET_ARRAYS = (("x", np.dtype("<f8"), ()), ("y", np.dtype("<f8"), ()), ("xspeed", np.dtype("<f8"), ()),
+                ("yspeed", np.dtype("<f8"), ()), ("init_x", np.dtype("<f8"), ()), ("init_y", np.dtype("<f8"), ()),
+                ("value", np.dtype("<i8"), ()), ("state", np.dtype("u1"), ()), ("path", np.dtype("<f8"), (4, 2)),
+                ("progress", np.dtype("<f8"), ()), ("path_step", np.dtype("<f8"), ()))
+
+
+def save_snapshot(game):
+    """
+    Method packs the state of a game into a snapshot. The game's recorder is not part of the snapshot.
+    :param game: the GameSimulation, between steps
+    :return: a bytes object
+    """
+    player = game.player
+    missiles = player.missiles
+    fleet = game.fleet
+    difficulty = game.difficulty
+    version, words, gauss = game.rng.getstate()
+    position = [coordinate for vertex in player.position for coordinate in vertex]
+    parts = [HEADER.pack(MAGIC, VERSION),
+             GAME.pack(game.seed, game.width, game.height, difficulty.drop_rate, difficulty.sway_speed,
+                       difficulty.sway_steps, difficulty.row_min, difficulty.row_growth, game.sway_direction,
+                       game.moves, game.score, game.level, game.completed_level, game.lost, game.frame,
+                       game.accumulator),
+             RANDOM.pack(version, gauss is not None, 0.0 if gauss is None else gauss),
+             RANDOM_WORDS.pack(*words),
+             PLAYER.pack(player.lives, player.speed, player.explosion, *position, len(player.shipHits), missiles.count),
+             np.array(player.shipHits, dtype="<i8").tobytes(),
+             missiles.x[:missiles.count].astype("<f8", copy=False).tobytes(),
+             missiles.y[:missiles.count].astype("<f8", copy=False).tobytes(),
+             FLEET.pack(fleet.width, fleet.offset, fleet.sway_speed, len(fleet.state))]
+    for name, dtype, _ in FLEET_ARRAYS:
+        parts.append(getattr(fleet, name).astype(dtype, copy=False).tobytes())
+    data = b"".join(parts)
+    return data + CRC.pack(zlib.crc32(data))
+
+
+def load_snapshot(data, game=None):
+    """
+    Method restores a game from a snapshot
+    :param data: the bytes of a snapshot from save_snapshot
+    :param game: a GameSimulation to load the state into, reusing its objects, or None to create a new one
+    :return: the GameSimulation, which carries on exactly as the game the snapshot was taken from would have
+    """
+    view = memoryview(data)
+    if len(view) < HEADER.size + CRC.size or CRC.unpack_from(view, len(view) - CRC.size)[0] != zlib.crc32(
+            view[:len(view) - CRC.size]):
+        raise ValueError("Snapshot is damaged or incomplete")
+    magic, version = HEADER.unpack_from(view)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a version %d snapshot" % VERSION)
+    offset = HEADER.size
+
+    (seed, width, height, drop_rate, sway_speed, sway_steps, row_min, row_growth, sway_direction, moves, score, level,
+     completed_level, lost, frame, accumulator) = GAME.unpack_from(view, offset)
+    offset += GAME.size
+    # Sizes and the drop rate are saved as floats, but are usually whole numbers
+    width, height, drop_rate = [int(number) if number.is_integer() else number for number in (width, height, drop_rate)]
+    difficulty = Difficulty(drop_rate, sway_speed, sway_steps, row_min, row_growth)
+    if game is None or game.width != width or game.height != height:
+        game = GameSimulation(width, height, seed, difficulty)
+    game.seed = seed
+    game.difficulty = difficulty
+    game.sway_direction = sway_direction
+    game.moves = moves
+    game.score = score
+    game.level = level
+    game.completed_level = completed_level
+    game.lost = lost
+    game.frame = frame
+    game.accumulator = accumulator
+    game.events = []
+
+    random_version, has_gauss, gauss = RANDOM.unpack_from(view, offset)
+    offset += RANDOM.size
+    words = RANDOM_WORDS.unpack_from(view, offset)
+    offset += RANDOM_WORDS.size
+    game.rng.setstate((random_version, words, gauss if has_gauss else None))
+
+    player = game.player
+    lives, speed, explosion, x0, y0, x1, y1, x2, y2, hits, count = PLAYER.unpack_from(view, offset)
+    offset += PLAYER.size
+    player.lives = lives
+    player.speed = speed
+    player.explosion = explosion
+    player.position = [(x0, y0), (x1, y1), (x2, y2)]
+    ship_hits = np.frombuffer(view, "<i8", hits * 2, offset).reshape(hits, 2)
+    offset += ship_hits.nbytes
+    player.shipHits = [tuple(hit) for hit in ship_hits.tolist()]
+    missiles = player.missiles
+    missiles.x[:count] = np.frombuffer(view, "<f8", count, offset)
+    offset += count * 8
+    missiles.y[:count] = np.frombuffer(view, "<f8", count, offset)
+    offset += count * 8
+    missiles.count = count
+
+    ship_width, fleet_offset, fleet_sway_speed, ships = FLEET.unpack_from(view, offset)
+    offset += FLEET.size
+    fleet = game.fleet
+    fleet.width = ship_width
+    fleet.offset = fleet_offset
+    fleet.sway_speed = fleet_sway_speed
+    for name, dtype, shape in FLEET_ARRAYS:
+        array = np.frombuffer(view, dtype, ships * (shape[0] * shape[1] if shape else 1), offset)
+        offset += array.nbytes
+        setattr(fleet, name, array.reshape((ships,) + shape).astype(dtype.newbyteorder("=")))
+    members = {kind: set() for kind in TRANSITIONS}
+    for index, kind in enumerate(fleet.state.tolist()):
+        members[kind].add(index)
+    fleet.members = members
+    return game
+
+
+def write_snapshot(filename, game):
+    """
+    Method saves a snapshot of a game to a file. The snapshot is written to a temporary file that then replaces the old
+    one, so a power loss leaves either the old snapshot or the new one.
+    :param filename: the name of the file to write
+    :param game: the GameSimulation to save
+    :return: None
+    """
+    data = save_snapshot(game)
+    directory = os.path.dirname(os.path.abspath(filename))
+    handle, temporary = tempfile.mkstemp(dir=directory, prefix=".snapshot-")
+    try:
+        with os.fdopen(handle, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, filename)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def read_snapshot(filename):
+    """
+    Method restores a game from a snapshot file
+    :param filename: the name of the file to read
+    :return: a GameSimulation
+    """
+    with open(filename, "rb") as f:
+        return load_snapshot(f.read())
+
@@ -0,0 +1,101 @@
+"""
+Uniform grid spatial index used to find which objects are near a point without checking every object.
+
+Each object is stored in the square cell that holds its top left corner. As long as no object is larger than a cell,
+an object that contains a point must be stored in the point's cell or the cell to its left, above it, or above and to
+the left, so a point query only has to look at four cells. Storing each object once keeps rebuilding the grid every
+frame cheap.
+"""
+
+
+class SpatialHash:
+    """
+    Class to represent a uniform grid of square cells, hashed by cell coordinates so it can cover any area
+    Instance variables:
+    cell_size - the width and height of a cell, which must be at least as large as any object stored
+    cells - a dictionary mapping (column, row) tuples to the list of objects whose top left corner is in that cell
+    """
+    def __init__(self, cell_size):
+        """
+        One argument constructor for SpatialHash
+        :param cell_size: the width and height of a cell
+        """
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def clear(self):
+        """
+        Method removes every object from the grid
+        :return: None
+        """
+        self.cells.clear()
+
+    def rebuild(self, items, xs, ys):
+        """
+        Method empties the grid and adds every object in a list to it. This does the same as calling insert for each
+        object but without the cost of a method call per object, which matters when the grid is rebuilt every frame.
+        :param items: a list of the objects to store
+        :param xs: a list of the x coordinates of the left of each object
+        :param ys: a list of the y coordinates of the top of each object
+        :return: None
+        """
+        size = self.cell_size
+        cells = self.cells
+        cells.clear()
+        for item, x, y in zip(items, xs, ys):
+            cell = (int(x // size), int(y // size))
+            contents = cells.get(cell)
+            if contents is None:
+                cells[cell] = [item]
+            else:
+                contents.append(item)
+
+    def insert(self, item, x, y):
+        """
+        Method adds an object to the cell holding its top left corner
+        :param item: the object to store
+        :param x: the x coordinate of the left of the object
+        :param y: the y coordinate of the top of the object
+        :return: None
+        """
+        size = self.cell_size
+        cell = (int(x // size), int(y // size))
+        contents = self.cells.get(cell)
+        if contents is None:
+            self.cells[cell] = [item]
+        else:
+            contents.append(item)
+
+    def remove(self, item, x, y):
+        """
+        Method removes an object from the grid. The coordinates must be the ones the object was inserted with.
+        :param item: the object to remove
+        :param x: the x coordinate of the left of the object
+        :param y: the y coordinate of the top of the object
+        :return: None
+        """
+        size = self.cell_size
+        cell = (int(x // size), int(y // size))
+        contents = self.cells.get(cell)
+        if contents is not None and item in contents:
+            contents.remove(item)
+            if len(contents) == 0:
+                del self.cells[cell]
+
+    def query_point(self, x, y):
+        """
+        Method returns the objects that might contain a point
+        :param x: the x coordinate of the point
+        :param y: the y coordinate of the point
+        :return: a list of the objects stored in the four cells an object containing the point could be in
+        """
+        size = self.cell_size
+        column = int(x // size)
+        row = int(y // size)
+        cells = self.cells
+        found = []
+        for cell in ((column, row), (column - 1, row), (column, row - 1), (column - 1, row - 1)):
+            contents = cells.get(cell)
+            if contents is not None:
+                found.extend(contents)
+        return found
@@ -0,0 +1,102 @@
+"""
+Batched drawing for the enemy ships and missiles.
+
+Drawing each ship and missile with its own pygame.draw.rect call (and a new Rect for each one) costs a Python call and
+a fill for every sprite. Instead each kind of sprite is drawn once into a cached Surface, and every sprite in a group is
+put on the screen with a single Surface.blits call. Enemy sprites are cached by the number of points the ship is worth,
+so ships of different values can be given their own look by adding a colour to ENEMY_COLORS.
+"""
+# Imports
+import pygame
+
+# Constants
+ENEMY_COLOR = (255, 153, 51)    # Colour of an enemy ship whose value has no colour of its own
+ENEMY_COLORS = {10: ENEMY_COLOR}    # Colour of the enemy ships worth each number of points
+MISSILE_COLOR = (0, 255, 0)     # Colour of the player's missiles
+MISSILE_SIZE = (2, 8)   # Width and height of a missile
+
+
+class SpriteBatch:
+    """
+    Class to represent the cached sprites and the code that draws them in batches
+    Instance variables:
+    enemies - a dictionary mapping (value, width) tuples to the Surface for that kind of enemy ship
+    missile - the Surface for a missile, or None until it is first needed
+    """
+    def __init__(self):
+        """
+        Default constructor for SpriteBatch
+        Starts with no sprites cached; each is drawn the first time it is needed.
+        """
+        self.enemies = {}
+        self.missile = None
+
+    def enemy_sprite(self, value, width):
+        """
+        Method returns the Surface for an enemy ship, drawing it the first time it is asked for
+        :param value: the number of points the ship is worth
+        :param width: the width and height of the ship
+        :return: a Surface
+        """
+        key = (value, width)
+        sprite = self.enemies.get(key)
+        if sprite is None:
+            sprite = make_sprite((width, width), ENEMY_COLORS.get(value, ENEMY_COLOR))
+            self.enemies[key] = sprite
+        return sprite
+
+    def missile_sprite(self):
+        """
+        Method returns the Surface for a missile, drawing it the first time it is asked for
+        :return: a Surface
+        """
+        if self.missile is None:
+            self.missile = make_sprite(MISSILE_SIZE, MISSILE_COLOR)
+        return self.missile
+
+    def draw_enemies(self, surface, fleet):
+        """
+        Method draws every ship in a fleet that hasn't been destroyed with one blit call
+        :param surface: the surface to draw the ships onto
+        :param fleet: the Fleet to draw
+        :return: a list of Rects covering the ships
+        """
+        alive = fleet.alive_indices()
+        width = fleet.get_width()
+        sprites = {}
+        for value in set(fleet.value[alive].tolist()):
+            sprites[value] = self.enemy_sprite(value, width)
+        return surface.blits(list(zip(map(sprites.__getitem__, fleet.value[alive].tolist()),
+                                      zip(fleet.x[alive].tolist(), fleet.y[alive].tolist()))))
+
+    def draw_missiles(self, surface, missiles):
+        """
+        Method draws every missile in the air with one blit call
+        :param surface: the surface to draw the missiles onto
+        :param missiles: the MissilePool to draw
+        :return: a list of Rects covering the missiles
+        """
+        sprite = self.missile_sprite()
+        return surface.blits([(sprite, position) for position in missiles.positions()])
+
+    def clear(self):
+        """
+        Method throws away the cached sprites, for example after the display mode changes
+        :return: None
+        """
+        self.enemies.clear()
+        self.missile = None
+
+
+def make_sprite(size, color):
+    """
+    Method draws a sprite that is a solid block of colour
+    :param size: a tuple with the width and height of the sprite
+    :param color: the colour of the sprite
+    :return: a Surface in the display's pixel format if there is a display
+    """
+    sprite = pygame.Surface(size)
+    sprite.fill(color)
+    if pygame.display.get_surface() is not None:
+        sprite = sprite.convert()
+    return sprite
@@ -0,0 +1,117 @@
+"""
+Cache for rendered text.
+
+Rendering a string with a font is much slower than blitting the Surface it produces, and most of the text on screen is
+the same from one frame to the next. The cache keeps the most recently used Surfaces, keyed by everything that affects
+how the text looks, and throws away the least recently used ones once it is full.
+
+Text that changes often, like the score, can be built out of cached Surfaces for each character instead, so a new
+score only costs a few blits rather than rendering the whole string again.
+"""
+# Imports
+from collections import OrderedDict
+import pygame
+
+
+class TextCache:
+    """
+    Class to represent a least recently used cache of rendered text Surfaces
+    Instance variables:
+    capacity - the most Surfaces that will be kept
+    surfaces - an OrderedDict mapping (font, text, antialias, color) tuples to Surfaces, least recently used first
+    hits - the number of requests that were answered from the cache
+    misses - the number of requests that had to render
+    """
+    def __init__(self, capacity=256):
+        """
+        Constructor for TextCache
+        :param capacity: the most Surfaces that will be kept
+        """
+        self.capacity = capacity
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key):
+        """
+        Method returns a cached Surface and marks it as the most recently used
+        :param key: the key of the Surface
+        :return: the Surface, or None if it isn't cached
+        """
+        surface = self.surfaces.get(key)
+        if surface is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+        return surface
+
+    def store(self, key, surface):
+        """
+        Method adds a Surface to the cache, throwing away the least recently used one if the cache is full
+        :param key: the key of the Surface
+        :param surface: the Surface to store
+        :return: None
+        """
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+
+    def render(self, font, text, antialias, color):
+        """
+        Method returns the Surface for a string, rendering it the first time it is asked for. It takes the same
+        arguments as Font.render, along with the font.
+        :param font: the Font to render with
+        :param text: the string to render
+        :param antialias: True for smooth edges
+        :param color: the colour of the text
+        :return: a Surface
+        """
+        key = (font, text, antialias, color)
+        surface = self.lookup(key)
+        if surface is None:
+            surface = font.render(text, antialias, color)
+            self.store(key, surface)
+        return surface
+
+    def render_glyphs(self, font, text, antialias, color):
+        """
+        Method returns the Surface for a string built by placing the cached Surface for each character side by side.
+        This is meant for short strings that change often, such as numbers, where most of the characters have been seen
+        before. The characters aren't kerned, which makes no difference for digits.
+        :param font: the Font to render with
+        :param text: the string to render
+        :param antialias: True for smooth edges
+        :param color: the colour of the text
+        :return: a Surface
+        """
+        key = (font, text, antialias, color, "glyphs")
+        surface = self.lookup(key)
+        if surface is None:
+            glyphs = [self.render(font, character, antialias, color) for character in text]
+            # Space the characters by how far the font moves along after each one
+            advances = [metrics[4] if metrics else glyph.get_width()
+                        for metrics, glyph in zip(font.metrics(text), glyphs)]
+            width = max(sum(advances[:-1]) + glyphs[-1].get_width(), sum(advances)) if glyphs else 0
+            surface = pygame.Surface((width, font.get_height()), pygame.SRCALPHA)
+            x = 0
+            for glyph, advance in zip(glyphs, advances):
+                # Taking the larger value copies the glyph onto the transparent Surface without darkening its edges
+                surface.blit(glyph, (x, 0), special_flags=pygame.BLEND_RGBA_MAX)
+                x += advance
+            self.store(key, surface)
+        return surface
+
+    def clear(self):
+        """
+        Method empties the cache
+        :return: None
+        """
+        self.surfaces.clear()
+
+    def stats(self):
+        """
+        Method returns the cache's counters
+        :return: a dictionary with the number of hits, misses, and cached Surfaces
+        """
+        return {"hits": self.hits, "misses": self.misses, "surfaces": len(self.surfaces)}
@@ -0,0 +1,226 @@
+"""
+Batch simulator for tuning the difficulty.
+
+Plays thousands of seeded headless games with a bot player for every combination of the Difficulty settings given, on
+a pool of worker processes using every core. For each setting it reports how long the bot survived, the scores it got,
+and how many games reached each level. Every setting is played with the same seeds, so differences between settings
+come from the settings rather than luck.
+
+Compare three drop rates with the other settings at their defaults, for example:
+    python tuning.py --games 2000 --drop-rate 1,2,3 --output tuning.json
+"""
+# Imports
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import time
+from collections import Counter
+import numpy as np
+from fleet import DIVING
+from profiler import percentile
+from simulation import DEFAULT_DIFFICULTY, Difficulty, FRAME_RATE, GameSimulation, Inputs, PLAYER_SPEED
+
+# Constants
+MAX_FRAMES = FRAME_RATE * 60 * 10   # Longest a game is played for, in steps, in case the bot never loses
+FIRE_EVERY = 8  # Number of steps between the bots' shots
+DODGE_DISTANCE = 80     # How close a diving ship has to get before the hunter bot moves out of its way
+REACTION_STEPS = 6  # Number of steps the hunter bot takes to react, so it can be caught out like a person
+WHOLE_FIELDS = ("sway_steps", "row_min", "row_growth")  # Difficulty settings that have to be whole numbers
+
+
+def random_bot(seed):
+    """
+    Method makes a bot that moves at random and fires at a steady rate
+    :param seed: the seed for the bot's choices
+    :return: a function that takes the GameSimulation and returns the Inputs for its next step
+    """
+    rng = random.Random(seed)
+
+    def play(game):
+        return Inputs(rng.choice((-1, 0, 1)), game.frame % FIRE_EVERY == 0)
+    return play
+
+
+def hunter_bot(seed):
+    """
+    Method makes a bot that moves out of the way of diving ships that get close, and otherwise lines up under the
+    lowest ship in the fleet, firing at a steady rate. It only decides where to move every REACTION_STEPS steps,
+    starting at a random step.
+    :param seed: the seed for the step the bot starts reacting on
+    :return: a function that takes the GameSimulation and returns the Inputs for its next step
+    """
+    phase = random.Random(seed).randrange(REACTION_STEPS)
+    last = [0]
+
+    def play(game):
+        fire = game.frame % FIRE_EVERY == 0
+        if game.frame % REACTION_STEPS != phase:
+            return Inputs(last[0], fire)
+        last[0] = hunter_move(game)
+        return Inputs(last[0], fire)
+    return play
+
+
+def hunter_move(game):
+    """
+    Method decides which way the hunter bot moves
+    :param game: the GameSimulation being played
+    :return: -1 to move left, 1 to move right, 0 to stand still
+    """
+    fleet = game.fleet
+    tip_x, tip_y = game.player.get_position()[0]
+    half = fleet.get_width() / 2
+    divers = fleet.indices(DIVING)
+    if len(divers) > 0:
+        dx = fleet.x[divers] + half - tip_x
+        dy = tip_y - fleet.y[divers]
+        near = (dy > -2 * half) & (dy < DODGE_DISTANCE) & (np.abs(dx) < DODGE_DISTANCE)
+        if near.any():
+            closest = dx[near][np.argmin(np.abs(dx[near]))]
+            return -1 if closest > 0 else 1
+    alive = fleet.alive_indices()
+    if len(alive) == 0:
+        return 0
+    target = fleet.x[alive[np.argmax(fleet.y[alive])]] + half
+    if abs(target - tip_x) < PLAYER_SPEED:
+        return 0
+    return 1 if target > tip_x else -1
+
+
+BOTS = {"random": random_bot, "hunter": hunter_bot}     # Bots that can play the games, by name
+
+
+def play_game(task):
+    """
+    Method plays one game with a bot until the bot loses or the game runs out of time. Runs in a worker process.
+    :param task: a tuple of the index of the setting, the Difficulty, the seed, the name of the bot, and the most steps
+    to play
+    :return: a tuple of the index of the setting, the number of steps survived, the score, the level reached, and True
+    if the bot lost
+    """
+    setting, difficulty, seed, bot, max_frames = task
+    game = GameSimulation(seed=seed, difficulty=difficulty)
+    player = BOTS[bot](seed)
+    step = game.step
+    while not game.lost and game.frame < max_frames:
+        step(player(game))
+    return setting, game.frame, game.score, game.level, game.lost
+
+
+def summarize(difficulty, results):
+    """
+    Method works out the distributions of the results of the games played at one setting
+    :param difficulty: the Difficulty the games were played at
+    :param results: a list of the tuples returned by play_game
+    :return: a dictionary with the setting, the number of games, the fraction lost, percentiles of the seconds survived
+    and the score, and the number of games that reached each level
+    """
+    seconds = [frames / FRAME_RATE for _, frames, _, _, _ in results]
+    scores = [score for _, _, score, _, _ in results]
+    levels = Counter(level for _, _, _, level, _ in results)
+    return {"difficulty": difficulty._asdict(),
+            "games": len(results),
+            "lost": sum(lost for _, _, _, _, lost in results) / max(len(results), 1),
+            "seconds": {"mean": sum(seconds) / max(len(seconds), 1), "p10": percentile(seconds, 0.1),
+                        "p50": percentile(seconds, 0.5), "p90": percentile(seconds, 0.9)},
+            "score": {"mean": sum(scores) / max(len(scores), 1), "p10": percentile(scores, 0.1),
+                      "p50": percentile(scores, 0.5), "p90": percentile(scores, 0.9)},
+            "levels": {str(level): levels[level] for level in sorted(levels)}}
+
+
+def sweep(settings, games, bot, seed=0, processes=None, max_frames=MAX_FRAMES):
+    """
+    Method plays a batch of games at every setting on a pool of worker processes
+    :param settings: a list of Difficulty tuples
+    :param games: the number of games to play at each setting
+    :param bot: the name of the bot in BOTS that plays the games
+    :param seed: the seed of the first game; the games at each setting use the seeds from it onwards
+    :param processes: the number of worker processes, defaulting to one per core, or 1 to play in this process
+    :param max_frames: the most steps a game is played for
+    :return: a list with a dictionary from summarize for each setting, in the order given
+    """
+    tasks = [(i, difficulty, seed + game, bot, max_frames)
+             for i, difficulty in enumerate(settings) for game in range(games)]
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        results = list(map(play_game, tasks))
+    else:
+        with multiprocessing.Pool(processes) as pool:
+            results = list(pool.imap_unordered(play_game, tasks, max(1, len(tasks) // (processes * 8))))
+    grouped = [[] for _ in settings]
+    for result in results:
+        grouped[result[0]].append(result)
+    return [summarize(difficulty, grouped[i]) for i, difficulty in enumerate(settings)]
+
+
+def number_list(text):
+    """
+    Method parses a comma separated list of numbers, keeping whole numbers as ints
+    :param text: a string such as "1,2,2.5"
+    :return: a list of ints and floats
+    """
+    try:
+        return [float(part) if "." in part else int(part) for part in text.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected comma separated numbers, got %r" % text)
+
+
+def whole_number_list(text):
+    """
+    Method parses a comma separated list of whole numbers
+    :param text: a string such as "8,10,12"
+    :return: a list of ints
+    """
+    try:
+        return [int(part) for part in text.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected comma separated whole numbers, got %r" % text)
+
+
+def print_summaries(summaries):
+    """
+    Method prints a table of the results of a sweep
+    :param summaries: a list of dictionaries from summarize
+    :return: None
+    """
+    names = list(Difficulty._fields)
+    print("  ".join("%10s" % name for name in names) + "  %6s %8s %8s %8s %8s %8s  levels"
+          % ("lost", "secs p10", "p50", "p90", "score", "p90"))
+    for summary in summaries:
+        difficulty = summary["difficulty"]
+        levels = " ".join("%s:%d" % (level, count) for level, count in summary["levels"].items())
+        print("  ".join("%10g" % difficulty[name] for name in names)
+              + "  %5.0f%% %8.1f %8.1f %8.1f %8.0f %8d  %s"
+              % (100 * summary["lost"], summary["seconds"]["p10"], summary["seconds"]["p50"],
+                 summary["seconds"]["p90"], summary["score"]["mean"], summary["score"]["p90"], levels))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Play batches of headless games to tune the difficulty")
+    parser.add_argument("--games", type=int, default=1000, help="number of games to play at each setting")
+    parser.add_argument("--bot", choices=sorted(BOTS), default="hunter", help="bot that plays the games")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game at each setting")
+    parser.add_argument("--processes", type=int, help="number of worker processes, defaulting to one per core")
+    parser.add_argument("--max-seconds", type=float, default=MAX_FRAMES / FRAME_RATE,
+                        help="longest a game is played for, in seconds of game time")
+    for name in Difficulty._fields:
+        default = getattr(DEFAULT_DIFFICULTY, name)
+        parser.add_argument("--" + name.replace("_", "-"),
+                            type=whole_number_list if name in WHOLE_FIELDS else number_list, default=[default],
+                            help="comma separated values of %s to try (default %s)" % (name, default))
+    parser.add_argument("--output", metavar="FILE", help="write the results to a JSON file")
+    args = parser.parse_args()
+
+    settings = [Difficulty(*values) for values in itertools.product(*(getattr(args, name)
+                                                                      for name in Difficulty._fields))]
+    start = time.perf_counter()
+    summaries = sweep(settings, args.games, args.bot, args.seed, args.processes, int(args.max_seconds * FRAME_RATE))
+    seconds = time.perf_counter() - start
+    print_summaries(summaries)
+    print("Played %d games in %.1f s" % (len(settings) * args.games, seconds))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"bot": args.bot, "seed": args.seed, "results": summaries}, f, indent=1)
@@ -0,0 +1,587 @@
+"""
+Headless simulation of many games of Galaga stepped together.
+
+A VectorSimulation plays a batch of independent games by the same rules as GameSimulation, but keeps the state of every
+game in NumPy arrays with one row per game, so a step of the whole batch is a fixed number of array operations rather
+than a Python call into each game. The fleets are padded with DESTROYED ships to the size of the biggest one, and every
+missile pool has the same capacity, so the ships and missiles of all the games line up in rows of the same length. The
+missiles that might have hit a ship are found by marking which grid cells hold a ship in one flat array for the whole
+batch and looking up the four cells around each missile (see spatial.py), so only the few missiles near a ship are
+checked against the fleet.
+
+Each game still makes its random choices with its own random.Random, in the same order GameSimulation makes them, and
+the things that only happen to a few games in a step (a ship starting a dive, a missile hitting a ship, a ship crashing
+into the player, a new level starting) are applied one game at a time. So a game in the batch plays out exactly as a
+GameSimulation with the same seed and inputs would, which state_hash can be used to check.
+"""
+# Imports
+import hashlib
+import random
+import struct
+import numpy as np
+from collision import broad_phase, narrow_phase, player_hit_circle
+from fleet import (AIM_SPEED, DESTROYED, DIVE_SPEED, DIVING, IN_FORMATION, RESET_SPEED, RESETTING, SHIP_WIDTH,
+                   SNAP_DISTANCE, dive_path, formation_positions)
+from simulation import (DEFAULT_DIFFICULTY, DEFAULT_HEIGHT, DEFAULT_WIDTH, EXPLOSION_FRAMES, GRID_CELL_SIZE,
+                        GRID_FLEET_RATIO, MISSILE_SPEED, PLAYER_SPEED, STARTING_LIVES, PlayerShip)
+
+# Constants
+SHIP_VALUE = 10     # Points for shooting down an enemy ship, as in GameSimulation
+FLEET_PADDING = 16  # The fleet arrays are a multiple of this many ships wide, so they rarely have to be regrown
+CELL_SIZE = 16  # Size of the grid cells used to find missiles near a ship; the smallest power of two at least a ship's
+# width, so working out a cell from a coordinate is exact
+
+
+class VectorSimulation:
+    """
+    Class to represent a batch of games of Galaga stepped together, each one a row of every array
+    Instance variables:
+    count - the number of games
+    width, height - the size of the playing field of every game
+    difficulty - the Difficulty every game is played at
+    seeds, rngs - lists with the seed of each game and the random.Random its random choices are made with
+    frame, score, level, moves - int arrays with each game's step count, score, level and sway counter
+    sway_direction, completed, lost - bool arrays with which way each fleet is swaying, which games are in between
+    levels and which have been lost
+    offset - float array with how far each game's formation has swayed from where it started
+    player_x - float array of shape (games, 3) with the x coordinates of the vertices of each player's ship, whose y
+    coordinates never change
+    speed, explosion, lives - int arrays with each player's speed, explosion count and lives left
+    hits - a list with each game's list of the ships that have hit the player, as in PlayerShip.shipHits
+    missile_x, missile_y, missile_count - the missile pools, with the first missile_count[i] slots of row i in use
+    x, y, xspeed, yspeed, init_x, init_y, value, state, path, progress, path_step - the fleet arrays, as in Fleet but
+    with one row per game
+    sizes, alive - int arrays with the number of ships in each game's fleet and how many of them haven't been destroyed
+    occupied - a flat bool array with whether each grid cell of every game holds a ship, reused every step
+    """
+    def __init__(self, count, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT, seeds=None, difficulty=DEFAULT_DIFFICULTY):
+        """
+        Constructor for VectorSimulation
+        Starts a game in every slot.
+        :param count: the number of games
+        :param width: the width of the playing field
+        :param height: the height of the playing field
+        :param seeds: a list of the seed of each game, or None to pick them at random
+        :param difficulty: the Difficulty to play at
+        """
+        self.count = count
+        self.width = width
+        self.height = height
+        self.difficulty = difficulty
+        # Everything about the player's ship that is the same in every game comes from one PlayerShip
+        player = PlayerShip(width, height)
+        self.start_x = np.array([x for x, _ in player.position])
+        self.player_y = [y for _, y in player.position]
+        self.leftmost = np.array([x for x, _ in player.leftmost])
+        self.rightmost = np.array([x for x, _ in player.rightmost])
+        self.min_x = player.min_x
+        self.max_x = player.max_x
+        _, self.center_y, self.radius = player_hit_circle(player.position, SHIP_WIDTH)
+        capacity = player.missiles.capacity
+
+        self.seeds = [None] * count
+        self.rngs = [None] * count
+        self.frame = np.zeros(count, dtype=np.int64)
+        self.score = np.zeros(count, dtype=np.int64)
+        self.level = np.zeros(count, dtype=np.int64)
+        self.moves = np.zeros(count, dtype=np.int64)
+        self.sway_direction = np.zeros(count, dtype=bool)
+        self.completed = np.zeros(count, dtype=bool)
+        self.lost = np.zeros(count, dtype=bool)
+        self.offset = np.zeros(count)
+        self.player_x = np.zeros((count, 3))
+        self.speed = np.zeros(count, dtype=np.int64)
+        self.explosion = np.zeros(count, dtype=np.int64)
+        self.lives = np.zeros(count, dtype=np.int64)
+        self.hits = [[] for _ in range(count)]
+        self.missile_x = np.zeros((count, capacity))
+        self.missile_y = np.zeros((count, capacity))
+        self.missile_count = np.zeros(count, dtype=np.int64)
+        self.slots = np.arange(capacity)
+        self.games = np.arange(count)
+
+        self.x = np.zeros((count, 0))
+        self.y = np.zeros((count, 0))
+        self.xspeed = np.zeros((count, 0))
+        self.yspeed = np.zeros((count, 0))
+        self.init_x = np.zeros((count, 0))
+        self.init_y = np.zeros((count, 0))
+        self.value = np.zeros((count, 0), dtype=np.int64)
+        self.state = np.zeros((count, 0), dtype=np.uint8)
+        self.path = np.zeros((count, 0, 4, 2))
+        self.progress = np.zeros((count, 0))
+        self.path_step = np.zeros((count, 0))
+        self.sizes = np.zeros(count, dtype=np.int64)
+        self.alive = np.zeros(count, dtype=np.int64)
+
+        # A ship that can be hit by a missile is in a cell from -1 to the last cell on screen, so each game gets a grid
+        # one cell bigger than the screen on every side and ships farther out are kept in the cells at its edge
+        self.columns = int(width // CELL_SIZE) + 2
+        self.rows = int(height // CELL_SIZE) + 2
+        self.first_cell = np.arange(count) * (self.rows * self.columns)
+        self.occupied = np.zeros(count * self.rows * self.columns, dtype=bool)
+
+        for i in range(count):
+            self.reset(i, None if seeds is None else seeds[i])
+
+    def __len__(self):
+        """
+        Method returns the number of games
+        :return: an int
+        """
+        return self.count
+
+    def reset(self, index, seed=None):
+        """
+        Method starts a new game in a slot
+        :param index: the slot of the game
+        :param seed: an int to seed the game's random number generator with, or None to pick one at random
+        :return: None
+        """
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(63)
+        self.seeds[index] = seed
+        self.rngs[index] = random.Random(seed)
+        self.frame[index] = 0
+        self.score[index] = 0
+        self.level[index] = 1
+        self.moves[index] = self.difficulty.sway_steps // 2
+        self.sway_direction[index] = True
+        self.completed[index] = False
+        self.lost[index] = False
+        self.player_x[index] = self.start_x
+        self.speed[index] = 0
+        self.explosion[index] = 0
+        self.lives[index] = STARTING_LIVES
+        self.hits[index] = []
+        self.missile_count[index] = 0
+        self.alive[index] = 0
+        self.start_level(index)
+
+    def grow(self, size):
+        """
+        Method makes the fleet arrays wide enough for a fleet of a number of ships, padding every game's fleet with
+        DESTROYED ships
+        :param size: the number of ships
+        :return: None
+        """
+        size = -(-size // FLEET_PADDING) * FLEET_PADDING
+        old = self.x.shape[1]
+        for name in ("x", "y", "xspeed", "yspeed", "init_x", "init_y", "value", "state", "path", "progress",
+                     "path_step"):
+            array = getattr(self, name)
+            grown = np.zeros((self.count, size) + array.shape[2:], dtype=array.dtype)
+            grown[:, :old] = array
+            setattr(self, name, grown)
+        self.state[:, old:] = DESTROYED
+
+    def start_level(self, index):
+        """
+        Method generates a fleet of enemies for a game's level, or puts the remaining ships back in formation if the
+        player lost a life, as GameSimulation.start_level does
+        :param index: the slot of the game
+        :return: None
+        """
+        if self.alive[index] > 0:
+            self.reset_formation(index)
+            return
+        rng = self.rngs[index]
+        row_min = self.difficulty.row_min
+        level = int(self.level[index])
+        nums = []
+        for i in range(5):
+            nums.append(rng.randint(row_min - i, (row_min + self.difficulty.row_growth * level) - i))
+        positions = formation_positions(nums, self.width)
+        count = len(positions)
+        if count > self.x.shape[1]:
+            self.grow(count)
+        coordinates = np.array(positions, dtype=float).reshape(count, 2)
+        for name in ("x", "init_x"):
+            getattr(self, name)[index] = 0
+            getattr(self, name)[index, :count] = coordinates[:, 0]
+        for name in ("y", "init_y"):
+            getattr(self, name)[index] = 0
+            getattr(self, name)[index, :count] = coordinates[:, 1]
+        self.xspeed[index] = 0
+        self.xspeed[index, :count] = (-1 + (2 * bool(self.sway_direction[index]))) * self.difficulty.sway_speed
+        self.yspeed[index] = 0
+        self.value[index] = 0
+        self.value[index, :count] = SHIP_VALUE
+        self.state[index] = DESTROYED
+        self.state[index, :count] = IN_FORMATION
+        self.path[index] = 0
+        self.progress[index] = 0
+        self.path_step[index] = 0
+        self.offset[index] = 0.0
+        self.sizes[index] = count
+        self.alive[index] = count
+
+    def reset_formation(self, index):
+        """
+        Method puts every remaining ship of a game back in its starting place in the formation
+        :param index: the slot of the game
+        :return: None
+        """
+        self.x[index] = self.init_x[index]
+        self.y[index] = self.init_y[index]
+        alive = self.state[index] != DESTROYED
+        self.xspeed[index, alive] = (-1 + (2 * bool(self.sway_direction[index]))) * self.difficulty.sway_speed
+        self.yspeed[index] = 0
+        self.state[index, alive] = IN_FORMATION
+        self.offset[index] = 0.0
+
+    def destroy(self, index, ship):
+        """
+        Method removes an enemy ship from a game
+        :param index: the slot of the game
+        :param ship: the index of the ship in the game's fleet
+        :return: None
+        """
+        self.state[index, ship] = DESTROYED
+        self.xspeed[index, ship] = 0
+        self.yspeed[index, ship] = 0
+        self.alive[index] -= 1
+
+    def step(self, moves, fires, active=None):
+        """
+        Method advances games by exactly one fixed timestep, as GameSimulation.step does for each of them
+        :param moves: an int array with each game's move, -1 to move left, 1 to move right, 0 to stand still
+        :param fires: a bool array, True for the games where fire was pressed since the last step
+        :param active: a bool array, True for the games to step, or None to step every game
+        :return: None
+        """
+        fires = np.asarray(fires, dtype=bool)
+        if active is None:
+            active = np.ones(self.count, dtype=bool)
+        self.frame += active
+        playing = active & ~self.lost
+        # Firing on the in between levels screen starts the next level
+        between = playing & self.completed
+        for index in np.flatnonzero(between & fires).tolist():
+            self.level[index] += 1
+            self.completed[index] = False
+            self.start_level(index)
+        playing &= ~self.completed
+        if not playing.any():
+            return
+        self.handle_inputs(np.asarray(moves), fires, playing & ~between)
+        self.move_players(playing)
+        self.drop_enemies(playing)
+        self.move_enemies(playing)
+        self.check_missile_collisions(playing)
+        self.check_ship_collisions(playing)
+        # Games whose fleets have been eliminated are in between levels
+        self.completed |= playing & (self.alive == 0)
+        self.lost |= playing & (self.lives < 0)
+
+    def handle_inputs(self, moves, fires, playing):
+        """
+        Method applies the controls for one step to the games being played
+        :param moves: an int array with each game's move
+        :param fires: a bool array with which games pressed fire
+        :param playing: a bool array, True for the games to apply the controls to
+        :return: None
+        """
+        ready = playing & (self.explosion == 0)
+        np.copyto(self.speed, moves * PLAYER_SPEED, where=ready)
+        firing = np.flatnonzero(ready & fires & (self.missile_count < len(self.slots)))
+        if len(firing) > 0:
+            slots = self.missile_count[firing]
+            self.missile_x[firing, slots] = self.player_x[firing, 0]
+            self.missile_y[firing, slots] = self.player_y[0]
+            self.missile_count[firing] += 1
+
+    def move_players(self, playing):
+        """
+        Method moves the players' ships and missiles, removes the missiles that have left the screen, and keeps the
+        ships in the viewable frame
+        :param playing: a bool array, True for the games being played
+        :return: None
+        """
+        self.explosion -= playing & (self.explosion > 0)
+        self.player_x += (self.speed * playing)[:, None]
+        # Only the first missiles of each row are in use, so the ones past the most any game has are left alone
+        counts = self.missile_count * playing
+        used = counts.max()
+        self.missile_y[:, :used] -= (MISSILE_SPEED * playing)[:, None]
+
+        # Remove the missiles that have gone off the top of the screen from the end of each pool first, a round at a
+        # time, since removing a missile moves the last one into its slot
+        gone = (self.missile_y[:, :used] < 0) & (self.slots[:used] < counts[:, None])
+        games, slots = np.nonzero(gone)
+        while len(games) > 0:
+            last = np.append(games[1:] != games[:-1], True)
+            self.remove_missiles(games[last], slots[last])
+            games = games[~last]
+            slots = slots[~last]
+
+        tip = self.player_x[:, 0]
+        self.player_x[tip < self.min_x] = self.leftmost
+        self.player_x[tip > self.max_x] = self.rightmost
+
+    def remove_missiles(self, games, slots):
+        """
+        Method removes one missile from each of a number of games by moving the last missile in the pool into its slot
+        :param games: an int array with the slots of the games, each at most once
+        :param slots: an int array with the slot of the missile to remove from each game
+        :return: None
+        """
+        last = self.missile_count[games] - 1
+        self.missile_x[games, slots] = self.missile_x[games, last]
+        self.missile_y[games, slots] = self.missile_y[games, last]
+        self.missile_count[games] = last
+
+    def drop_enemies(self, playing):
+        """
+        Method gives each game being played its chance of an enemy diving at the player, as
+        GameSimulation.drop_enemies does
+        :param playing: a bool array, True for the games being played
+        :return: None
+        """
+        rngs = self.rngs
+        games = np.flatnonzero(playing & (self.alive > 0))
+        nums = np.array([rngs[index].random() for index in games.tolist()]) * 500
+        for index in games[nums < self.difficulty.drop_rate * self.level[games]].tolist():
+            alive = np.flatnonzero(self.state[index] != DESTROYED)
+            self.drop(index, int(alive[rngs[index].randrange(len(alive))]))
+
+    def drop(self, index, ship):
+        """
+        Method makes an enemy ship in the formation dive through the middle of the player's hit circle
+        :param index: the slot of the game
+        :param ship: the index of the ship in the game's fleet
+        :return: None
+        """
+        if self.state[index, ship] != IN_FORMATION:
+            return
+        self.state[index, ship] = DIVING
+        target = (float(self.player_x[index, 0]), self.center_y)
+        self.path[index, ship], self.path_step[index, ship] = dive_path(
+            float(self.x[index, ship]), float(self.y[index, ship]), SHIP_WIDTH, target, self.width, self.height)
+        self.progress[index, ship] = 0.0
+
+    def move_enemies(self, playing):
+        """
+        Method moves the fleets of the games being played by one step, as Fleet.update does for each of them, and
+        turns the sway around when it is time
+        :param playing: a bool array, True for the games being played
+        :return: None
+        """
+        self.moves += playing
+        sway_speed = (-1 + (2 * self.sway_direction)) * self.difficulty.sway_speed
+        # Most steps every game is being played, and the ships of the others can be left out with a mask
+        rows = True if playing.all() else playing[:, None]
+        np.copyto(self.xspeed, sway_speed[:, None], where=(self.state != DESTROYED) & rows)
+
+        # Move the diving ships along their curves, and straight down once they have come to the end of them
+        games, ships = np.nonzero((self.state == DIVING) & rows)
+        if len(games) > 0:
+            path = self.path[games, ships]
+            # Move the ends of the curves towards where each player is now (see Fleet.update)
+            shift = np.maximum(np.minimum(self.player_x[games, 0] - SHIP_WIDTH / 2 - path[:, :, 0].sum(axis=1),
+                                          AIM_SPEED), -AIM_SPEED)
+            path[:, 2, 0] += 3 * shift
+            path[:, 3, 0] -= 2 * shift
+            self.path[games, ships] = path
+            progress = self.progress[games, ships]
+            t = np.minimum(progress + self.path_step[games, ships], 1.0)
+            self.progress[games, ships] = t
+            s = t[:, None]
+            points = ((path[:, 3] * s + path[:, 2]) * s + path[:, 1]) * s + path[:, 0]
+            ended = progress >= 1.0
+            y = self.y[games, ships]
+            self.xspeed[games, ships] = np.where(ended, 0, points[:, 0] - self.x[games, ships])
+            self.yspeed[games, ships] = np.where(ended, DIVE_SPEED, points[:, 1] - y)
+            # Send them back to the top if they have gone off the bottom of the screen
+            fallen = y > self.height
+            games = games[fallen]
+            ships = ships[fallen]
+            self.y[games, ships] = -SHIP_WIDTH
+            self.yspeed[games, ships] = 0
+            self.state[games, ships] = RESETTING
+
+        # Have the resetting ships fly back to their place in the formation
+        games, ships = np.nonzero((self.state == RESETTING) & rows)
+        if len(games) > 0:
+            desired_x = self.init_x[games, ships] + self.offset[games]
+            desired_y = self.init_y[games, ships]
+            x = self.x[games, ships]
+            y = self.y[games, ships]
+            dx = desired_x - x
+            dy = desired_y - y
+            self.xspeed[games, ships] = np.where(dx != 0, np.sign(dx) * RESET_SPEED, sway_speed[games])
+            self.yspeed[games, ships] = np.where(dy != 0, np.sign(dy) * RESET_SPEED, self.yspeed[games, ships])
+            x = np.where(np.abs(dx) < SNAP_DISTANCE, desired_x, x)
+            y = np.where(np.abs(dy) < SNAP_DISTANCE, desired_y, y)
+            self.x[games, ships] = x
+            self.y[games, ships] = y
+            arrived = (x == desired_x) & (y == desired_y)
+            games = games[arrived]
+            ships = ships[arrived]
+            self.xspeed[games, ships] = sway_speed[games]
+            self.yspeed[games, ships] = 0
+            self.state[games, ships] = IN_FORMATION
+
+        # Move every ship, keeping the ships in the formation exactly in their places. A fleet with no ships at all
+        # doesn't sway, as in Fleet.update.
+        moving = playing & (self.sizes > 0)
+        self.offset = np.where(moving, self.offset + sway_speed, self.offset)
+        if moving.all():
+            self.x += self.xspeed
+            self.y += self.yspeed
+        else:
+            self.x[moving] += self.xspeed[moving]
+            self.y[moving] += self.yspeed[moving]
+        np.copyto(self.x, self.init_x + self.offset[:, None], where=self.state == IN_FORMATION)
+
+        # If it's time to switch the direction of the sway
+        turning = playing & (self.moves > self.difficulty.sway_steps)
+        self.sway_direction ^= turning
+        self.moves[turning] = 0
+
+    def check_missile_collisions(self, playing):
+        """
+        Method removes the missiles that have hit an enemy ship and the ships they hit, in the games being played. The
+        cells of every game's grid that hold a ship are marked, and only the missiles with a marked cell around them
+        are checked against their game's fleet.
+        :param playing: a bool array, True for the games being played
+        :return: None
+        """
+        counts = self.missile_count * playing
+        if not counts.any():
+            return
+        columns = self.columns
+        scale = 1 / CELL_SIZE
+        # Converting to int rounds towards zero, which is the same as rounding down for every cell from -1 on
+        column = np.clip((self.x * scale + 1).astype(np.intp), 0, columns - 1)
+        row = np.clip((self.y * scale + 1).astype(np.intp), 0, self.rows - 1)
+        cells = row * columns + column + self.first_cell[:, None]
+        occupied = self.occupied
+        occupied[:] = False
+        occupied[cells[(self.state != DESTROYED) & (True if playing.all() else playing[:, None])]] = True
+
+        # Only the first missiles of each row are in use, so the ones past the most any game has are left out
+        used = counts.max()
+        held = self.slots[:used] < counts[:, None]
+        mx = self.missile_x[:, :used]
+        my = self.missile_y[:, :used]
+        cells = (my * scale + 1).astype(np.intp) * columns + (mx * scale + 1).astype(np.intp)
+        cells = np.where(held, cells, columns + 1) + self.first_cell[:, None]
+        near = occupied[cells] | occupied[cells - 1] | occupied[cells - columns] | occupied[cells - columns - 1]
+        near = np.flatnonzero(near & held)
+        if len(near) == 0:
+            return
+        games, slots = np.divmod(near, used)
+        mx = mx.ravel()[near, None]
+        my = my.ravel()[near, None]
+        xs = self.x[games]
+        ys = self.y[games]
+        inside = ((self.state[games] != DESTROYED) & (xs < mx) & (mx < xs + SHIP_WIDTH) &
+                  (ys < my) & (my < ys + SHIP_WIDTH))
+        hits = inside.sum(axis=1)
+        games = games[hits > 0]
+        slots = slots[hits > 0]
+        inside = inside[hits > 0]
+        # Nearly always a game has only one missile inside only one ship, which is hit whatever order they are looked
+        # at in, so those hits are applied together
+        alone = (hits[hits > 0] == 1) & (np.bincount(games, minlength=self.count)[games] == 1)
+        if alone.any():
+            index = games[alone]
+            ships = inside[alone].argmax(axis=1)
+            self.score[index] += self.value[index, ships]
+            self.state[index, ships] = DESTROYED
+            self.xspeed[index, ships] = 0
+            self.yspeed[index, ships] = 0
+            self.alive[index] -= 1
+            self.remove_missiles(index, slots[alone])
+        for index in np.unique(games[~alone]).tolist():
+            mine = games == index
+            self.shoot_down(index, int(counts[index]), slots[mine].tolist(), inside[mine])
+
+    def shoot_down(self, index, count, slots, inside):
+        """
+        Method applies the hits of the missiles of one game that are inside an enemy ship, in the order
+        GameSimulation.check_missile_collisions finds them: from the end of the pool, with each missile taking the
+        first ship it is inside that is still alive, in the order the grid or the whole fleet would be searched in
+        :param index: the slot of the game
+        :param count: the number of missiles in the game's pool
+        :param slots: a list of the slots of the missiles that are inside a ship, in order
+        :param inside: a bool array of shape (missiles, ships), True where a missile is inside a ship
+        :return: None
+        """
+        use_grid = count * GRID_FLEET_RATIO >= self.alive[index]
+        size = GRID_CELL_SIZE
+        xs = self.x[index]
+        ys = self.y[index]
+        state = self.state[index]
+        for slot, ships in reversed(list(zip(slots, inside))):
+            ships = [ship for ship in np.flatnonzero(ships).tolist() if state[ship] != DESTROYED]
+            if len(ships) == 0:
+                continue
+            if use_grid:
+                # The grid looks in the missile's cell, then the cells to the left, above, and above and to the left
+                mx = float(self.missile_x[index, slot])
+                my = float(self.missile_y[index, slot])
+                column = int(mx // size)
+                row = int(my // size)
+                ships.sort(key=lambda ship: (column - int(xs[ship] // size)) + 2 * (row - int(ys[ship] // size)))
+            ship = ships[0]
+            self.score[index] += self.value[index, ship]
+            self.destroy(index, ship)
+            self.remove_missiles(np.array([index]), np.array([slot]))
+
+    def check_ship_collisions(self, playing):
+        """
+        Method checks if a diving enemy ship has collided with the player ship in the games being played. In a game
+        where one has, the first such ship is removed, the player loses a life, and the rest of the fleet is put back
+        in formation, so any other ship that hit the player at the same time is no longer diving.
+        :param playing: a bool array, True for the games being played
+        :return: None
+        """
+        games, ships = np.nonzero((self.state == DIVING) & (True if playing.all() else playing[:, None]))
+        if len(games) == 0:
+            return
+        xs = self.x[games, ships]
+        ys = self.y[games, ships]
+        center_x = self.player_x[games, 0]
+        center_y = self.center_y
+        radius = self.radius
+        box = (center_x - radius, center_y - radius, center_x + radius, center_y + radius)
+        hit = (broad_phase(xs, ys, SHIP_WIDTH, box) &
+               narrow_phase(xs, ys, SHIP_WIDTH, (center_x, center_y, radius)))
+        if not hit.any():
+            return
+        games = games[hit]
+        ships = ships[hit]
+        first = np.append(True, games[1:] != games[:-1])
+        for index, ship in zip(games[first].tolist(), ships[first].tolist()):
+            self.destroy(index, ship)
+            hits = self.hits[index]
+            if (int(self.level[index]), ship) not in hits:
+                hits.append((int(self.level[index]), ship))
+            self.lives[index] = STARTING_LIVES - len(hits)
+            self.explosion[index] = EXPLOSION_FRAMES
+            self.speed[index] = 0
+            # Put the rest of the fleet back in formation
+            if self.alive[index] > 0:
+                self.start_level(index)
+
+    def state_hash(self, index):
+        """
+        Method returns a short hash of everything that makes up the state of a game, the same as
+        GameSimulation.state_hash of a GameSimulation in the same state
+        :param index: the slot of the game
+        :return: a bytes object 8 bytes long
+        """
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update(struct.pack("<qqqq??dq", self.frame[index], self.score[index], self.level[index],
+                                  self.moves[index], self.sway_direction[index], self.lost[index],
+                                  self.offset[index], self.explosion[index]))
+        digest.update(struct.pack("<q", self.lives[index]))
+        digest.update(np.column_stack((self.player_x[index], self.player_y)).tobytes())
+        count = self.missile_count[index]
+        digest.update(np.column_stack((self.missile_x[index, :count], self.missile_y[index, :count])).tobytes())
+        size = self.sizes[index]
+        for array in (self.x, self.y, self.xspeed, self.yspeed, self.state, self.path, self.progress):
+            digest.update(array[index, :size].tobytes())
+        return digest.digest()